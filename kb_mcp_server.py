@@ -27,10 +27,12 @@ Nya funktioner i 2.1.0:
 import asyncio
 import json
 import os
+import re
 import sys
 import logging
-from typing import Any, Optional, List, Dict
-from urllib.parse import urlencode, quote_plus
+from contextlib import asynccontextmanager
+from functools import lru_cache, wraps
+from typing import Annotated, Any, AsyncIterator, Iterator, Optional, List, Dict, Tuple
 
 # MCP imports
 from mcp.server.fastmcp import FastMCP
@@ -40,36 +42,77 @@ from pydantic import Field
 from src.api_client import (
     api_client,
     URLS,
+    ACCEPT_JSON,
+    ACCEPT_JSONLD,
+    ACCEPT_SPARQL_JSON,
+    ACCEPT_XML,
+    ACCEPT_RDFXML,
+    ACCEPT_TURTLE,
+    canonicalize_query,
     handle_api_error,
+    parse_json,
+    dump_json,
+    dump_ndjson,
+    response_preview,
     parse_ksamsok_xml,
     parse_oaipmh_xml,
     format_libris_results,
+    format_libris_record,
     format_ksamsok_results,
     format_sparql_results,
     format_swepub_results,
+    format_async,
     format_ris,
     format_bibtex,
+    jsonld_to_rdf,
     get_cache_stats,
     clear_cache,
     get_config,
+    configure_logging,
     Config
 )
 
-# Konfigurera logging till stderr
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    stream=sys.stderr
-)
+# Konfigurera logging till stderr innan FastMCP skapas (annars sätter
+# FastMCP upp root-loggern med sitt eget format)
+configure_logging()
 logger = logging.getLogger("kb_mcp")
 
 # ============================================================================
 # MCP SERVER SETUP
 # ============================================================================
 
+# Antal aktiva MCP-sessioner (SSE kan ha flera samtidigt)
+_active_sessions = 0
+
+# DNS-uppvärmning som körs i bakgrunden vid första sessionen
+_dns_prewarm_task: Optional["asyncio.Task[Dict[str, bool]]"] = None
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Värmer DNS vid första sessionen och stänger den delade HTTP-klienten
+    när sista sessionen avslutas.
+    """
+    global _active_sessions, _dns_prewarm_task
+    _active_sessions += 1
+    if Config.DNS_PREWARM and _dns_prewarm_task is None:
+        _dns_prewarm_task = asyncio.create_task(api_client.prewarm_dns())
+    try:
+        yield
+    finally:
+        _active_sessions -= 1
+        if _active_sessions == 0:
+            if _dns_prewarm_task is not None and not _dns_prewarm_task.done():
+                _dns_prewarm_task.cancel()
+            _dns_prewarm_task = None
+            await api_client.close()
+
+
 mcp = FastMCP(
     "kb-api",
-    instructions="Kungliga bibliotekets öppna API:er - tillgång till 20M+ bibliografiska poster, 10M+ kulturarvsobjekt, svensk forskningspublicering och länkad data."
+    instructions="Kungliga bibliotekets öppna API:er - tillgång till 20M+ bibliografiska poster, 10M+ kulturarvsobjekt, svensk forskningspublicering och länkad data.",
+    lifespan=server_lifespan
 )
 
 
@@ -77,10 +120,7 @@ mcp = FastMCP(
 # MCP RESOURCES - Read-only data för kontext
 # ============================================================================
 
-@mcp.resource("kb://api/overview")
-def resource_api_overview() -> str:
-    """Översikt över alla KB API:er och deras kapacitet."""
-    return """# Kungliga bibliotekets öppna API:er
+_RESOURCE_API_OVERVIEW = """# Kungliga bibliotekets öppna API:er
 
 ## Tillgängliga datakällor
 
@@ -118,10 +158,13 @@ Alla API:er är öppna och gratis att använda.
 """
 
 
-@mcp.resource("kb://search/syntax")
-def resource_search_syntax() -> str:
-    """Komplett guide till söksyntax för alla API:er."""
-    return """# Söksyntax för KB:s API:er
+@mcp.resource("kb://api/overview")
+def resource_api_overview() -> str:
+    """Översikt över alla KB API:er och deras kapacitet."""
+    return _RESOURCE_API_OVERVIEW
+
+
+_RESOURCE_SEARCH_SYNTAX = """# Söksyntax för KB:s API:er
 
 ## Libris - Sökoperatorer
 
@@ -186,10 +229,13 @@ PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
 """
 
 
-@mcp.resource("kb://examples/libris")
-def resource_examples_libris() -> str:
-    """Exempelfrågor för Libris-sökning."""
-    return """# Libris - Exempelfrågor
+@mcp.resource("kb://search/syntax")
+def resource_search_syntax() -> str:
+    """Komplett guide till söksyntax för alla API:er."""
+    return _RESOURCE_SEARCH_SYNTAX
+
+
+_RESOURCE_EXAMPLES_LIBRIS = """# Libris - Exempelfrågor
 
 ## Hitta böcker av en författare
 ```
@@ -235,10 +281,13 @@ export_subject_bibliography(subject="svensk litteratur", format="bibtex")
 """
 
 
-@mcp.resource("kb://examples/ksamsok")
-def resource_examples_ksamsok() -> str:
-    """Exempelfrågor för K-samsök kulturarvssökning."""
-    return """# K-samsök - Exempelfrågor
+@mcp.resource("kb://examples/libris")
+def resource_examples_libris() -> str:
+    """Exempelfrågor för Libris-sökning."""
+    return _RESOURCE_EXAMPLES_LIBRIS
+
+
+_RESOURCE_EXAMPLES_KSAMSOK = """# K-samsök - Exempelfrågor
 
 ## Sök kulturarvsobjekt
 
@@ -311,10 +360,13 @@ ksamsok_statistics(index="county")
 """
 
 
-@mcp.resource("kb://examples/sparql")
-def resource_examples_sparql() -> str:
-    """SPARQL-frågeexempel för länkad data-analys."""
-    return """# SPARQL - Exempelfrågor
+@mcp.resource("kb://examples/ksamsok")
+def resource_examples_ksamsok() -> str:
+    """Exempelfrågor för K-samsök kulturarvssökning."""
+    return _RESOURCE_EXAMPLES_KSAMSOK
+
+
+_RESOURCE_EXAMPLES_SPARQL = """# SPARQL - Exempelfrågor
 
 ## Grundläggande frågor
 
@@ -369,6 +421,11 @@ sparql_describe(resource_uri="https://libris.kb.se/bib/12345")
 sparql_count(query="?s a <http://purl.org/ontology/bibo/Book>")
 ```
 
+### Finns det några träffar? (snabbt för breda mönster)
+```
+sparql_count(query="?s a <http://purl.org/ontology/bibo/Book>", mode="exists")
+```
+
 ### Visa mallar
 ```
 sparql_templates(category="authors")
@@ -377,10 +434,13 @@ sparql_templates(category="statistics")
 """
 
 
-@mcp.resource("kb://examples/research")
-def resource_examples_research() -> str:
-    """Exempelfrågor för forskningspublikationer (Swepub)."""
-    return """# Swepub - Forskningspublikationer
+@mcp.resource("kb://examples/sparql")
+def resource_examples_sparql() -> str:
+    """SPARQL-frågeexempel för länkad data-analys."""
+    return _RESOURCE_EXAMPLES_SPARQL
+
+
+_RESOURCE_EXAMPLES_RESEARCH = """# Swepub - Forskningspublikationer
 
 ## Sök publikationer
 
@@ -432,10 +492,13 @@ swepub_export(query="quantum computing", format="bibtex")
 """
 
 
-@mcp.resource("kb://data/objecttypes")
-def resource_object_types() -> str:
-    """Lista över objekttyper i K-samsök."""
-    return """# K-samsök - Objekttyper (itemType)
+@mcp.resource("kb://examples/research")
+def resource_examples_research() -> str:
+    """Exempelfrågor för forskningspublikationer (Swepub)."""
+    return _RESOURCE_EXAMPLES_RESEARCH
+
+
+_RESOURCE_OBJECT_TYPES = """# K-samsök - Objekttyper (itemType)
 
 ## Vanliga objekttyper
 
@@ -481,10 +544,13 @@ ksamsok_search(query="itemType=Building AND fromTime>=1600")
 """
 
 
-@mcp.resource("kb://data/historicalperiods")
-def resource_historical_periods() -> str:
-    """Svenska historiska perioder med årtal."""
-    return """# Svenska historiska perioder
+@mcp.resource("kb://data/objecttypes")
+def resource_object_types() -> str:
+    """Lista över objekttyper i K-samsök."""
+    return _RESOURCE_OBJECT_TYPES
+
+
+_RESOURCE_HISTORICAL_PERIODS = """# Svenska historiska perioder
 
 Fördefinierade tidsperioder för sökning i K-samsök.
 
@@ -517,10 +583,13 @@ ksamsok_search_time(from_year=1611, to_year=1721)
 """
 
 
-@mcp.resource("kb://data/universities")
-def resource_universities() -> str:
-    """Svenska lärosäten för Swepub-sökning."""
-    return """# Svenska lärosäten (Swepub)
+@mcp.resource("kb://data/historicalperiods")
+def resource_historical_periods() -> str:
+    """Svenska historiska perioder med årtal."""
+    return _RESOURCE_HISTORICAL_PERIODS
+
+
+_RESOURCE_UNIVERSITIES = """# Svenska lärosäten (Swepub)
 
 Organisationsnamn för sökning i Swepub forskningspublikationer.
 
@@ -563,10 +632,13 @@ prompt_compare_institutions(
 """
 
 
-@mcp.resource("kb://data/subjectcodes")
-def resource_subject_codes() -> str:
-    """SCB forskningsämnen för Swepub."""
-    return """# SCB Forskningsämnen (Swepub)
+@mcp.resource("kb://data/universities")
+def resource_universities() -> str:
+    """Svenska lärosäten för Swepub-sökning."""
+    return _RESOURCE_UNIVERSITIES
+
+
+_RESOURCE_SUBJECT_CODES = """# SCB Forskningsämnen (Swepub)
 
 Standard för klassificering av svensk forskning enligt SCB.
 
@@ -596,10 +668,13 @@ swepub_search(query="ämne:historia")
 """
 
 
-@mcp.resource("kb://config/environment")
-def resource_environment_config() -> str:
-    """Miljövariabel-konfiguration för KB MCP Server."""
-    return """# KB MCP Server - Miljövariabler
+@mcp.resource("kb://data/subjectcodes")
+def resource_subject_codes() -> str:
+    """SCB forskningsämnen för Swepub."""
+    return _RESOURCE_SUBJECT_CODES
+
+
+_RESOURCE_ENVIRONMENT_CONFIG = """# KB MCP Server - Miljövariabler
 
 Servern kan konfigureras via miljövariabler.
 
@@ -610,6 +685,17 @@ Servern kan konfigureras via miljövariabler.
 | `KB_HTTP_TIMEOUT` | 30.0 | Maximal tid för HTTP-anrop (sekunder) |
 | `KB_CONNECT_TIMEOUT` | 10.0 | Maximal tid för att upprätta anslutning |
 
+## Anslutningsinställningar
+
+| Variabel | Standard | Beskrivning |
+|----------|----------|-------------|
+| `KB_MAX_CONNECTIONS` | 100 | Max antal samtidiga anslutningar |
+| `KB_MAX_KEEPALIVE_CONNECTIONS` | 20 | Max antal vilande keep-alive-anslutningar |
+| `KB_MAX_CONCURRENT_REQUESTS` | 20 | Max antal samtidiga anrop mot KB:s API:er (övriga väntar) |
+| `KB_KEEPALIVE_EXPIRY` | 60.0 | Hur länge vilande anslutningar hålls öppna (sekunder) |
+| `KB_HTTP2_ENABLED` | true | Använd HTTP/2 mot KB:s servrar (kräver `h2`) |
+| `KB_DNS_PREWARM` | true | Slå upp KB:s värdnamn i bakgrunden vid start |
+
 ## Retry-inställningar
 
 | Variabel | Standard | Beskrivning |
@@ -625,11 +711,32 @@ Servern kan konfigureras via miljövariabler.
 | `KB_CACHE_ENABLED` | true | Aktivera/avaktivera cache |
 | `KB_CACHE_TTL` | 300 | Cache-livslängd i sekunder (5 min) |
 | `KB_CACHE_MAX_SIZE` | 1000 | Max antal cachade poster |
+| `KB_CACHE_MAX_BYTES` | 524288 | Max storlek per cachat svar i byte (512 KB) |
+| `KB_ISBN_CACHE_TTL` | 86400 | Cache-livslängd för ISBN-sökningar (1 dygn) |
+| `KB_IDKB_CACHE_TTL` | 604800 | Cache-livslängd för entiteter, termer och vokabulärer på id.kb.se (1 vecka; `/find`-sökningar använder `KB_CACHE_TTL`) |
+| `KB_NEGATIVE_CACHE_TTL` | 300 | Cache-livslängd för 404/410-svar (okända ID:n) |
+| `KB_STATUS_CACHE_TTL` | 60 | Cache-livslängd för statuskontroller i kb_api_status |
+
+## SPARQL
+
+| Variabel | Standard | Beskrivning |
+|----------|----------|-------------|
+| `KB_MAX_RESPONSE_BYTES` | 20971520 | Max avkodad storlek på SPARQL-svar innan nedladdningen avbryts (20 MB) |
+| `KB_SPARQL_DEFAULT_LIMIT` | 10000 | LIMIT som läggs till i SELECT-frågor utan egen LIMIT |
+
+## Formatering
+
+| Variabel | Standard | Beskrivning |
+|----------|----------|-------------|
+| `KB_FORMAT_WORKERS` | 8 | Antal trådar för formatering av stora resultat |
+| `KB_FORMAT_OFFLOAD_THRESHOLD` | 50 | Antal poster över vilket formatering sker i trådpool |
+| `KB_LOCAL_RDF_CONVERSION` | false | Konvertera cachad JSON-LD till Turtle/RDF-XML lokalt med rdflib i `kb_data_get_metadata` |
 
 ## Övrigt
 
 | Variabel | Standard | Beskrivning |
 |----------|----------|-------------|
+| `KB_BATCH_CONCURRENCY` | 10 | Max samtidiga anrop i batch-verktyg (`kb_data_get_items`) |
 | `KB_USER_AGENT` | KB-MCP-Server/2.2.0 | User-Agent för HTTP-anrop |
 
 ## Exempel
@@ -656,11 +763,40 @@ kb_server_config()
 """
 
 
+@mcp.resource("kb://config/environment")
+def resource_environment_config() -> str:
+    """Miljövariabel-konfiguration för KB MCP Server."""
+    return _RESOURCE_ENVIRONMENT_CONFIG
+
+
 # ============================================================================
 # MCP PROMPTS - Fördefinierade promptmallar
 # ============================================================================
 
+# Antal renderade prompts som sparas per promptmall
+PROMPT_CACHE_SIZE = 256
+
+
+def memoized_prompt(func):
+    """
+    Memoiserar en promptmall på dess argument.
+
+    FastMCP kräver en vanlig funktion (inte ett lru_cache-objekt), så
+    den cachade varianten kapslas in i en funktion med samma signatur.
+    """
+    cached = lru_cache(maxsize=PROMPT_CACHE_SIZE)(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return cached(*args, **kwargs)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
 @mcp.prompt()
+@memoized_prompt
 def prompt_find_books_by_author(author_name: str) -> str:
     """Hitta alla böcker av en specifik författare."""
     return f"""Jag vill hitta alla böcker av författaren {author_name}.
@@ -675,6 +811,7 @@ Börja sökningen nu."""
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_research_topic(topic: str) -> str:
     """Utforska ett ämne med hjälp av KB:s resurser."""
     return f"""Jag vill utforska ämnet "{topic}" genom KB:s databaser.
@@ -701,6 +838,7 @@ Börja utforskningen nu."""
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_genealogy_search(parish: str, county: str = "") -> str:
     """Sök släktforskningsrelaterat material."""
     location_info = f"socknen {parish}"
@@ -735,6 +873,7 @@ Visa resultat med bilder när det finns tillgängligt. Fokusera på material som
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_cultural_heritage_location(county: str) -> str:
     """Utforska kulturarvet i ett specifikt län."""
     return f"""Jag vill utforska kulturarvet i {county}.
@@ -770,6 +909,7 @@ Sammanfatta de mest intressanta fynden och ge rekommendationer för vidare utfor
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_export_bibliography(topic: str, format: str = "ris") -> str:
     """Skapa en bibliografi för ett ämne."""
     format_info = "RIS (för Zotero/EndNote)" if format == "ris" else "BibTeX (för LaTeX)"
@@ -798,6 +938,7 @@ Skapa bibliografin nu."""
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_sparql_analysis(analysis_type: str = "statistics") -> str:
     """Utför dataanalys med SPARQL."""
     return f"""Jag vill göra en {analysis_type}-analys av Libris data med SPARQL.
@@ -826,10 +967,7 @@ def prompt_sparql_analysis(analysis_type: str = "statistics") -> str:
 Börja med att visa relevanta mallar och sedan köra analysen."""
 
 
-@mcp.prompt()
-def prompt_time_period_search(from_year: int, to_year: int) -> str:
-    """Utforska en specifik tidsperiod."""
-    return f"""Jag vill utforska perioden {from_year}-{to_year} i svenska samlingar.
+_TIME_PERIOD_TEMPLATE = """Jag vill utforska perioden {from_year}-{to_year} i svenska samlingar.
 
 ## Sökplan
 
@@ -862,6 +1000,14 @@ Starta utforskningen av perioden {from_year}-{to_year}."""
 
 
 @mcp.prompt()
+@memoized_prompt
+def prompt_time_period_search(from_year: int, to_year: int) -> str:
+    """Utforska en specifik tidsperiod."""
+    return _TIME_PERIOD_TEMPLATE.format(from_year=from_year, to_year=to_year)
+
+
+@mcp.prompt()
+@memoized_prompt
 def prompt_compare_institutions(institution1: str, institution2: str) -> str:
     """Jämför forskningsproduktion mellan två lärosäten."""
     return f"""Jämför forskningsproduktionen mellan {institution1} och {institution2}.
@@ -892,6 +1038,7 @@ Genomför jämförelsen nu."""
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_create_bibliography(
     topic: str,
     format: str = "ris",
@@ -922,6 +1069,7 @@ Skapa bibliografin nu."""
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_local_history(
     municipality: str,
     county: str = ""
@@ -961,6 +1109,7 @@ Sammanfatta de mest intressanta fynden och ge en historisk överblick av {munici
 
 
 @mcp.prompt()
+@memoized_prompt
 def prompt_author_deep_dive(author_name: str) -> str:
     """Djupgående analys av en författares verk och betydelse."""
     return f"""Jag vill göra en djupgående analys av författaren {author_name}.
@@ -1005,12 +1154,26 @@ Genomför analysen nu."""
 # 1. LIBRIS XSEARCH (5 verktyg)
 # ============================================================================
 
+# Gemensamma Xsearch-parametrar - kopieras in i varje anrops params-dict
+XSEARCH_BASE_PARAMS = {"format": "json", "format_extended": "true"}
+
+# Tar bort bindestreck och blanktecken ur ISBN och gör kontrollsiffran x versal
+_ISBN_TRANSLATION = str.maketrans("x", "X", "- \t\n\r")
+
+
+@lru_cache(maxsize=128)
+def _isbn_params(isbn: str) -> Dict[str, Any]:
+    """Bygger Xsearch-parametrar för ett ISBN (delad dict - får inte ändras)."""
+    isbn_clean = isbn.translate(_ISBN_TRANSLATION)
+    return {**XSEARCH_BASE_PARAMS, "query": f"isbn:{isbn_clean}", "n": 1}
+
+
 @mcp.tool()
 async def libris_search(
-    query: str = Field(description="Sökfråga, t.ex. 'Astrid Lindgren' eller 'Pippi Långstrump'"),
-    limit: int = Field(default=10, ge=1, le=200, description="Max antal resultat (1-200)"),
-    offset: int = Field(default=0, ge=0, description="Börja från resultat nummer"),
-    format: str = Field(default="markdown", description="Utdataformat: 'markdown' eller 'json'")
+    query: Annotated[str, Field(description="Sökfråga, t.ex. 'Astrid Lindgren' eller 'Pippi Långstrump'")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat (1-200)")] = 10,
+    offset: Annotated[int, Field(ge=0, description="Börja från resultat nummer")] = 0,
+    format: Annotated[str, Field(description="Utdataformat: 'markdown' eller 'json'")] = "markdown"
 ) -> str:
     """
     Enkel fritextsökning i Libris bibliotekskatalog.
@@ -1018,16 +1181,15 @@ async def libris_search(
     """
     try:
         params = {
-            "query": query,
+            **XSEARCH_BASE_PARAMS,
+            "query": canonicalize_query(query),
             "n": limit,
-            "start": offset,
-            "format": "json",
-            "format_extended": "true"
+            "start": offset
         }
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        return format_libris_results(data, format)
+        data = parse_json(response)
+        return await format_async(format_libris_results, data, format)
         
     except Exception as e:
         return handle_api_error(e, "libris_search")
@@ -1035,26 +1197,21 @@ async def libris_search(
 
 @mcp.tool()
 async def libris_search_author(
-    author_name: str = Field(description="Författarens namn, t.ex. 'Strindberg, August' eller 'Lagerlöf'"),
-    limit: int = Field(default=10, ge=1, le=200, description="Max antal resultat"),
-    sort_order: str = Field(default="date_desc", description="Sortering: 'date_desc', 'date_asc', 'title'")
+    author_name: Annotated[str, Field(description="Författarens namn, t.ex. 'Strindberg, August' eller 'Lagerlöf'")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 10,
+    sort_order: Annotated[str, Field(description="Sortering: 'date_desc', 'date_asc', 'title'")] = "date_desc"
 ) -> str:
     """
     Sök verk av en specifik författare i Libris.
     Använder författarfältet för exakt matchning.
     """
     try:
-        query = f"författare:{author_name}"
-        params = {
-            "query": query,
-            "n": limit,
-            "format": "json",
-            "format_extended": "true"
-        }
+        query = canonicalize_query(f"författare:{author_name}")
+        params = {**XSEARCH_BASE_PARAMS, "query": query, "n": limit}
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        return format_libris_results(data, "markdown")
+        data = parse_json(response)
+        return await format_async(format_libris_results, data, "markdown")
         
     except Exception as e:
         return handle_api_error(e, "libris_search_author")
@@ -1062,9 +1219,9 @@ async def libris_search_author(
 
 @mcp.tool()
 async def libris_search_title(
-    title: str = Field(description="Verkets titel, t.ex. 'Röda rummet' eller 'Nils Holgersson'"),
-    exact_match: bool = Field(default=False, description="Kräv exakt titelmatchning"),
-    limit: int = Field(default=10, ge=1, le=200, description="Max antal resultat")
+    title: Annotated[str, Field(description="Verkets titel, t.ex. 'Röda rummet' eller 'Nils Holgersson'")],
+    exact_match: Annotated[bool, Field(description="Kräv exakt titelmatchning")] = False,
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 10
 ) -> str:
     """
     Sök efter en specifik boktitel i Libris.
@@ -1072,20 +1229,16 @@ async def libris_search_title(
     """
     try:
         if exact_match:
-            query = f'titel:"{title}"'
+            query = f'titel:"{title.strip()}"'
         else:
             query = f"titel:{title}"
+        query = canonicalize_query(query)
         
-        params = {
-            "query": query,
-            "n": limit,
-            "format": "json",
-            "format_extended": "true"
-        }
+        params = {**XSEARCH_BASE_PARAMS, "query": query, "n": limit}
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        return format_libris_results(data, "markdown")
+        data = parse_json(response)
+        return await format_async(format_libris_results, data, "markdown")
         
     except Exception as e:
         return handle_api_error(e, "libris_search_title")
@@ -1093,25 +1246,20 @@ async def libris_search_title(
 
 @mcp.tool()
 async def libris_search_subject(
-    subject: str = Field(description="Ämnesord, t.ex. 'vikingatiden', 'klimatförändringar', 'svenska språket'"),
-    limit: int = Field(default=10, ge=1, le=200, description="Max antal resultat")
+    subject: Annotated[str, Field(description="Ämnesord, t.ex. 'vikingatiden', 'klimatförändringar', 'svenska språket'")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 10
 ) -> str:
     """
     Sök efter böcker inom ett specifikt ämne.
     Använder kontrollerade ämnesord från Svenska ämnesord.
     """
     try:
-        query = f"ämne:{subject}"
-        params = {
-            "query": query,
-            "n": limit,
-            "format": "json",
-            "format_extended": "true"
-        }
+        query = canonicalize_query(f"ämne:{subject}")
+        params = {**XSEARCH_BASE_PARAMS, "query": query, "n": limit}
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        return format_libris_results(data, "markdown")
+        data = parse_json(response)
+        return await format_async(format_libris_results, data, "markdown")
         
     except Exception as e:
         return handle_api_error(e, "libris_search_subject")
@@ -1119,26 +1267,27 @@ async def libris_search_subject(
 
 @mcp.tool()
 async def libris_search_isbn(
-    isbn: str = Field(description="ISBN-nummer (10 eller 13 siffror), t.ex. '9789113084718'")
+    isbn: Annotated[str, Field(description="ISBN-nummer (10 eller 13 siffror), t.ex. '9789113084718'")]
 ) -> str:
     """
     Sök efter en bok via dess ISBN-nummer.
     Returnerar exakt den bok som matchar ISBN.
     """
     try:
-        # Rensa ISBN från bindestreck och mellanslag
-        isbn_clean = isbn.replace("-", "").replace(" ", "")
+        params = _isbn_params(isbn)
         
-        params = {
-            "query": f"isbn:{isbn_clean}",
-            "n": 1,
-            "format": "json",
-            "format_extended": "true"
-        }
+        # ISBN-poster ändras sällan - cacha längre än vanliga sökningar
+        response = await api_client.get(
+            URLS["libris_xsearch"],
+            params=params,
+            cache_ttl=Config.ISBN_CACHE_TTL
+        )
+        data = parse_json(response)
         
-        response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        return format_libris_results(data, "markdown")
+        record = format_libris_record(data)
+        if record is None:
+            return f"Ingen bok hittades med ISBN {isbn}."
+        return record
         
     except Exception as e:
         return handle_api_error(e, "libris_search_isbn")
@@ -1150,8 +1299,8 @@ async def libris_search_isbn(
 
 @mcp.tool()
 async def libris_get_record(
-    record_id: str = Field(description="Libris post-ID, t.ex. 'bib/12345' eller bara '12345'"),
-    format: str = Field(default="markdown", description="Utdataformat: 'markdown' eller 'json'")
+    record_id: Annotated[str, Field(description="Libris post-ID, t.ex. 'bib/12345' eller bara '12345'")],
+    format: Annotated[str, Field(description="Utdataformat: 'markdown' eller 'json'")] = "markdown"
 ) -> str:
     """
     Hämta en specifik bibliografisk post från Libris via dess ID.
@@ -1163,11 +1312,11 @@ async def libris_get_record(
             record_id = f"/{record_id}"
         
         url = f"{URLS['libris_xl']}{record_id}"
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         if format == "json":
-            return json.dumps(data, indent=2, ensure_ascii=False)
+            return dump_json(data)
         
         # Markdown-formatering
         main_entity = data.get("mainEntity", data.get("@graph", [{}])[0] if "@graph" in data else data)
@@ -1220,9 +1369,9 @@ async def libris_get_record(
 
 @mcp.tool()
 async def libris_find(
-    query: str = Field(description="Avancerad sökning. Stödjer: AND, OR, NOT, fält:värde. Ex: 'author:Strindberg AND year:[1890 TO 1900]'"),
-    limit: int = Field(default=10, ge=1, le=200, description="Max antal resultat"),
-    offset: int = Field(default=0, ge=0, description="Börja från resultat nummer")
+    query: Annotated[str, Field(description="Avancerad sökning. Stödjer: AND, OR, NOT, fält:värde. Ex: 'author:Strindberg AND year:[1890 TO 1900]'")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 10,
+    offset: Annotated[int, Field(ge=0, description="Börja från resultat nummer")] = 0
 ) -> str:
     """
     Avancerad sökning i Libris med boolska operatorer och fältspecifik sökning.
@@ -1236,8 +1385,8 @@ async def libris_find(
             "_offset": offset
         }
         
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, params=params, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         items = data.get("items", [])
         total = data.get("totalItems", len(items))
@@ -1273,7 +1422,7 @@ async def libris_find(
 
 @mcp.tool()
 async def libris_get_holdings(
-    record_id: str = Field(description="Libris post-ID för att hitta vilka bibliotek som har boken")
+    record_id: Annotated[str, Field(description="Libris post-ID för att hitta vilka bibliotek som har boken")]
 ) -> str:
     """
     Hämta biblioteksbestånd för en Libris-post.
@@ -1286,8 +1435,8 @@ async def libris_get_holdings(
             "_limit": 50
         }
         
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, params=params, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         items = data.get("items", [])
         
@@ -1315,7 +1464,7 @@ async def libris_get_holdings(
 
 @mcp.tool()
 async def libris_get_work(
-    work_id: str = Field(description="Verk-ID från Libris, t.ex. 'fnl123456' för att hitta alla utgåvor")
+    work_id: Annotated[str, Field(description="Verk-ID från Libris, t.ex. 'fnl123456' för att hitta alla utgåvor")]
 ) -> str:
     """
     Hämta information om ett verk och alla dess utgåvor/manifestationer.
@@ -1328,8 +1477,8 @@ async def libris_get_work(
             "_limit": 50
         }
         
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, params=params, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         items = data.get("items", [])
         
@@ -1362,8 +1511,8 @@ async def libris_get_work(
 
 @mcp.tool()
 async def libris_autocomplete(
-    prefix: str = Field(description="Början av söktermen för förslag, t.ex. 'strin' → 'Strindberg'"),
-    entity_type: str = Field(default="Person", description="Entitetstyp: 'Person', 'Work', 'Subject', 'Organization'")
+    prefix: Annotated[str, Field(description="Början av söktermen för förslag, t.ex. 'strin' → 'Strindberg'")],
+    entity_type: Annotated[str, Field(description="Entitetstyp: 'Person', 'Work', 'Subject', 'Organization'")] = "Person"
 ) -> str:
     """
     Få sökförslag baserat på en prefix-sträng.
@@ -1377,8 +1526,8 @@ async def libris_autocomplete(
             "_limit": 10
         }
         
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, params=params, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         items = data.get("items", [])
         
@@ -1403,8 +1552,8 @@ async def libris_autocomplete(
 
 @mcp.tool()
 async def libris_related(
-    record_id: str = Field(description="Post-ID för att hitta relaterade verk"),
-    relation_type: str = Field(default="all", description="Relationstyp: 'all', 'subject', 'author', 'series'")
+    record_id: Annotated[str, Field(description="Post-ID för att hitta relaterade verk")],
+    relation_type: Annotated[str, Field(description="Relationstyp: 'all', 'subject', 'author', 'series'")] = "all"
 ) -> str:
     """
     Hitta relaterade verk baserat på ämne, författare eller serie.
@@ -1413,8 +1562,8 @@ async def libris_related(
     try:
         # Hämta posten först
         url = f"{URLS['libris_xl']}/{record_id}"
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         main = data.get("mainEntity", data.get("@graph", [{}])[0] if "@graph" in data else data)
         
@@ -1469,10 +1618,10 @@ async def libris_related(
 
 @mcp.tool()
 async def ksamsok_search(
-    query: str = Field(description="CQL-sökning, t.ex. 'text=runsten' eller 'itemType=Photograph'"),
-    limit: int = Field(default=10, ge=1, le=500, description="Max antal resultat"),
-    start_record: int = Field(default=1, ge=1, description="Börja från post nummer"),
-    format: str = Field(default="markdown", description="Utdataformat: 'markdown' eller 'json'")
+    query: Annotated[str, Field(description="CQL-sökning, t.ex. 'text=runsten' eller 'itemType=Photograph'")],
+    limit: Annotated[int, Field(ge=1, le=500, description="Max antal resultat")] = 10,
+    start_record: Annotated[int, Field(ge=1, description="Börja från post nummer")] = 1,
+    format: Annotated[str, Field(description="Utdataformat: 'markdown' eller 'json'")] = "markdown"
 ) -> str:
     """
     Sök kulturarvsobjekt i K-samsök (83 institutioner, 10M+ objekt).
@@ -1486,10 +1635,10 @@ async def ksamsok_search(
             "startRecord": start_record
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+        data = parse_ksamsok_xml(response.content)
         
-        return format_ksamsok_results(data, format)
+        return await format_async(format_ksamsok_results, data, format)
         
     except Exception as e:
         return handle_api_error(e, "ksamsok_search")
@@ -1497,11 +1646,11 @@ async def ksamsok_search(
 
 @mcp.tool()
 async def ksamsok_search_location(
-    county: str = Field(default="", description="Län, t.ex. 'Uppsala län', 'Stockholms län'"),
-    municipality: str = Field(default="", description="Kommun, t.ex. 'Uppsala', 'Stockholm'"),
-    parish: str = Field(default="", description="Socken/Församling"),
-    item_type: str = Field(default="", description="Objekttyp, t.ex. 'Photograph', 'Building', 'Runestone'"),
-    limit: int = Field(default=20, ge=1, le=500, description="Max antal resultat")
+    county: Annotated[str, Field(description="Län, t.ex. 'Uppsala län', 'Stockholms län'")] = "",
+    municipality: Annotated[str, Field(description="Kommun, t.ex. 'Uppsala', 'Stockholm'")] = "",
+    parish: Annotated[str, Field(description="Socken/Församling")] = "",
+    item_type: Annotated[str, Field(description="Objekttyp, t.ex. 'Photograph', 'Building', 'Runestone'")] = "",
+    limit: Annotated[int, Field(ge=1, le=500, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök kulturarvsobjekt inom ett geografiskt område.
@@ -1530,10 +1679,10 @@ async def ksamsok_search_location(
             "startRecord": 1
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+        data = parse_ksamsok_xml(response.content)
         
-        return format_ksamsok_results(data, "markdown")
+        return await format_async(format_ksamsok_results, data, "markdown")
         
     except Exception as e:
         return handle_api_error(e, "ksamsok_search_location")
@@ -1541,10 +1690,10 @@ async def ksamsok_search_location(
 
 @mcp.tool()
 async def ksamsok_search_type(
-    item_type: str = Field(description="Objekttyp: 'Photograph', 'Painting', 'Building', 'Runestone', 'Coin', 'Map', etc."),
-    has_image: bool = Field(default=False, description="Kräv att objektet har en bild"),
-    has_coordinates: bool = Field(default=False, description="Kräv att objektet har koordinater"),
-    limit: int = Field(default=20, ge=1, le=500, description="Max antal resultat")
+    item_type: Annotated[str, Field(description="Objekttyp: 'Photograph', 'Painting', 'Building', 'Runestone', 'Coin', 'Map', etc.")],
+    has_image: Annotated[bool, Field(description="Kräv att objektet har en bild")] = False,
+    has_coordinates: Annotated[bool, Field(description="Kräv att objektet har koordinater")] = False,
+    limit: Annotated[int, Field(ge=1, le=500, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök kulturarvsobjekt efter typ med möjlighet att filtrera på bild/koordinater.
@@ -1565,10 +1714,10 @@ async def ksamsok_search_type(
             "startRecord": 1
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+        data = parse_ksamsok_xml(response.content)
         
-        return format_ksamsok_results(data, "markdown")
+        return await format_async(format_ksamsok_results, data, "markdown")
         
     except Exception as e:
         return handle_api_error(e, "ksamsok_search_type")
@@ -1576,10 +1725,10 @@ async def ksamsok_search_type(
 
 @mcp.tool()
 async def ksamsok_search_time(
-    from_year: int = Field(description="Startår, t.ex. 1700"),
-    to_year: int = Field(description="Slutår, t.ex. 1800"),
-    item_type: str = Field(default="", description="Objekttyp (valfritt)"),
-    limit: int = Field(default=20, ge=1, le=500, description="Max antal resultat")
+    from_year: Annotated[int, Field(description="Startår, t.ex. 1700")],
+    to_year: Annotated[int, Field(description="Slutår, t.ex. 1800")],
+    item_type: Annotated[str, Field(description="Objekttyp (valfritt)")] = "",
+    limit: Annotated[int, Field(ge=1, le=500, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök kulturarvsobjekt från en specifik tidsperiod.
@@ -1598,10 +1747,10 @@ async def ksamsok_search_time(
             "startRecord": 1
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+        data = parse_ksamsok_xml(response.content)
         
-        return format_ksamsok_results(data, "markdown")
+        return await format_async(format_ksamsok_results, data, "markdown")
         
     except Exception as e:
         return handle_api_error(e, "ksamsok_search_time")
@@ -1609,8 +1758,8 @@ async def ksamsok_search_time(
 
 @mcp.tool()
 async def ksamsok_get_object(
-    uri: str = Field(description="Objekt-URI, t.ex. 'raa/fmi/10028500550001' eller full URL"),
-    format: str = Field(default="markdown", description="Utdataformat: 'markdown' eller 'json'")
+    uri: Annotated[str, Field(description="Objekt-URI, t.ex. 'raa/fmi/10028500550001' eller full URL")],
+    format: Annotated[str, Field(description="Utdataformat: 'markdown' eller 'json'")] = "markdown"
 ) -> str:
     """
     Hämta fullständig information om ett specifikt kulturarvsobjekt.
@@ -1628,11 +1777,11 @@ async def ksamsok_get_object(
             "objectId": full_uri
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
         
         # Parsning av enskilt objekt
         import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(response.content)
         
         ns = {"ksam": "http://kulturarvsdata.se/ksamsok#"}
         
@@ -1656,7 +1805,7 @@ async def ksamsok_get_object(
                 obj[field] = elem.text
         
         if format == "json":
-            return json.dumps(obj, indent=2, ensure_ascii=False)
+            return dump_json(obj)
         
         lines = [
             f"## {obj.get('label', 'Kulturarvsobjekt')}",
@@ -1685,8 +1834,8 @@ async def ksamsok_get_object(
 
 @mcp.tool()
 async def ksamsok_get_relations(
-    uri: str = Field(description="Objekt-URI för att hitta relationer"),
-    relation_type: str = Field(default="all", description="Relationstyp: 'all', 'sameAs', 'isPartOf', 'isContainedIn'")
+    uri: Annotated[str, Field(description="Objekt-URI för att hitta relationer")],
+    relation_type: Annotated[str, Field(description="Relationstyp: 'all', 'sameAs', 'isPartOf', 'isContainedIn'")] = "all"
 ) -> str:
     """
     Hämta relationer för ett kulturarvsobjekt.
@@ -1704,10 +1853,10 @@ async def ksamsok_get_relations(
             "maxDepth": 1
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
         
         import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(response.content)
         
         relations = []
         for rel in root.findall(".//relation"):
@@ -1736,8 +1885,8 @@ async def ksamsok_get_relations(
 
 @mcp.tool()
 async def ksamsok_statistics(
-    index: str = Field(description="Index att visa statistik för: 'serviceOrganization', 'itemType', 'county', 'municipality'"),
-    query: str = Field(default="*", description="Begränsa statistiken till en delmängd")
+    index: Annotated[str, Field(description="Index att visa statistik för: 'serviceOrganization', 'itemType', 'county', 'municipality'")],
+    query: Annotated[str, Field(description="Begränsa statistiken till en delmängd")] = "*"
 ) -> str:
     """
     Hämta statistik och facetter för K-samsök.
@@ -1750,10 +1899,10 @@ async def ksamsok_statistics(
             "query": query if query != "*" else ""
         }
         
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
         
         import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(response.content)
         
         stats = []
         for term in root.findall(".//term"):
@@ -1787,11 +1936,11 @@ async def ksamsok_statistics(
 
 @mcp.tool()
 async def oaipmh_list_records(
-    set_spec: str = Field(default="", description="Delmängd, t.ex. 'bib', 'auth', 'hold'. Lämna tom för alla."),
-    metadata_prefix: str = Field(default="oai_dc", description="Metadataformat: 'oai_dc', 'marcxml', 'mods'"),
-    from_date: str = Field(default="", description="Från datum (YYYY-MM-DD), t.ex. '2024-01-01'"),
-    until_date: str = Field(default="", description="Till datum (YYYY-MM-DD)"),
-    limit: int = Field(default=10, ge=1, le=100, description="Max antal poster att visa")
+    set_spec: Annotated[str, Field(description="Delmängd, t.ex. 'bib', 'auth', 'hold'. Lämna tom för alla.")] = "",
+    metadata_prefix: Annotated[str, Field(description="Metadataformat: 'oai_dc', 'marcxml', 'mods'")] = "oai_dc",
+    from_date: Annotated[str, Field(description="Från datum (YYYY-MM-DD), t.ex. '2024-01-01'")] = "",
+    until_date: Annotated[str, Field(description="Till datum (YYYY-MM-DD)")] = "",
+    limit: Annotated[int, Field(ge=1, le=100, description="Max antal poster att visa")] = 10
 ) -> str:
     """
     Hämta poster från Libris via OAI-PMH för bulkexport.
@@ -1810,8 +1959,8 @@ async def oaipmh_list_records(
         if until_date:
             params["until"] = until_date
         
-        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
-        data = parse_oaipmh_xml(response.text)
+        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept=ACCEPT_XML)
+        data = parse_oaipmh_xml(response.content)
         
         records = data.get("records", [])[:limit]
         token = data.get("resumption_token")
@@ -1838,8 +1987,8 @@ async def oaipmh_list_records(
 
 @mcp.tool()
 async def oaipmh_get_record(
-    identifier: str = Field(description="OAI-identifier, t.ex. 'https://libris.kb.se/bib/12345'"),
-    metadata_prefix: str = Field(default="oai_dc", description="Metadataformat: 'oai_dc', 'marcxml'")
+    identifier: Annotated[str, Field(description="OAI-identifier, t.ex. 'https://libris.kb.se/bib/12345'")],
+    metadata_prefix: Annotated[str, Field(description="Metadataformat: 'oai_dc', 'marcxml'")] = "oai_dc"
 ) -> str:
     """
     Hämta en specifik post via OAI-PMH.
@@ -1852,10 +2001,10 @@ async def oaipmh_get_record(
             "metadataPrefix": metadata_prefix
         }
         
-        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
+        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept=ACCEPT_XML)
         
         # Returnera rå XML för GetRecord
-        return f"## OAI-PMH Post\n**ID:** {identifier}\n**Format:** {metadata_prefix}\n\n```xml\n{response.text[:3000]}\n```"
+        return f"## OAI-PMH Post\n**ID:** {identifier}\n**Format:** {metadata_prefix}\n\n```xml\n{response_preview(response, 3000)}\n```"
         
     except Exception as e:
         return handle_api_error(e, "oaipmh_get_record")
@@ -1870,8 +2019,8 @@ async def oaipmh_list_sets() -> str:
     try:
         params = {"verb": "ListSets"}
         
-        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
-        data = parse_oaipmh_xml(response.text)
+        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept=ACCEPT_XML)
+        data = parse_oaipmh_xml(response.content)
         
         sets = data.get("sets", [])
         
@@ -1899,10 +2048,10 @@ async def oaipmh_list_formats() -> str:
     try:
         params = {"verb": "ListMetadataFormats"}
         
-        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
+        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept=ACCEPT_XML)
         
         import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(response.content)
         ns = {"oai": "http://www.openarchives.org/OAI/2.0/"}
         
         formats = []
@@ -1933,7 +2082,7 @@ async def oaipmh_list_formats() -> str:
 
 @mcp.tool()
 async def oaipmh_resume(
-    resumption_token: str = Field(description="Resumption token från tidigare anrop för att hämta nästa sida")
+    resumption_token: Annotated[str, Field(description="Resumption token från tidigare anrop för att hämta nästa sida")]
 ) -> str:
     """
     Fortsätt paginering av OAI-PMH-resultat.
@@ -1945,8 +2094,8 @@ async def oaipmh_resume(
             "resumptionToken": resumption_token
         }
         
-        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
-        data = parse_oaipmh_xml(response.text)
+        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept=ACCEPT_XML)
+        data = parse_oaipmh_xml(response.content)
         
         records = data.get("records", [])
         next_token = data.get("resumption_token")
@@ -1975,12 +2124,12 @@ async def oaipmh_resume(
 
 
 # ============================================================================
-# 5. DATA.KB.SE (5 verktyg)
+# 5. DATA.KB.SE (6 verktyg)
 # ============================================================================
 
 @mcp.tool()
 async def kb_data_list_collections(
-    path: str = Field(default="", description="Samlingssökväg, t.ex. 'smdb' för ljud/video, 'dark' för webarkiv")
+    path: Annotated[str, Field(description="Samlingssökväg, t.ex. 'smdb' för ljud/video, 'dark' för webarkiv")] = ""
 ) -> str:
     """
     Lista digitala samlingar på data.kb.se.
@@ -1989,8 +2138,8 @@ async def kb_data_list_collections(
     try:
         url = f"{URLS['kb_data']}/{path}" if path else URLS['kb_data']
         
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         items = data.get("@graph", [data]) if "@graph" in data else [data]
         
@@ -2012,9 +2161,26 @@ async def kb_data_list_collections(
         return handle_api_error(e, "kb_data_list_collections")
 
 
+def _format_kb_data_item(item_id: str, data: Dict[str, Any]) -> str:
+    """Formaterar ett objekt från data.kb.se (delas av kb_data_get_item/get_items)."""
+    lines = [
+        f"## Digitalt Objekt: {item_id}",
+        ""
+    ]
+    
+    for key, value in data.items():
+        if not key.startswith("@") and value:
+            if isinstance(value, str):
+                lines.append(f"**{key}:** {value}")
+            elif isinstance(value, dict):
+                lines.append(f"**{key}:** {json.dumps(value, ensure_ascii=False)[:100]}")
+    
+    return "\n".join(lines) if len(lines) > 2 else f"Ingen data hittades för {item_id}."
+
+
 @mcp.tool()
 async def kb_data_get_item(
-    item_id: str = Field(description="Objekt-ID från data.kb.se, t.ex. 'bib/12345'")
+    item_id: Annotated[str, Field(description="Objekt-ID från data.kb.se, t.ex. 'bib/12345'")]
 ) -> str:
     """
     Hämta ett specifikt digitalt objekt från data.kb.se.
@@ -2023,37 +2189,72 @@ async def kb_data_get_item(
     try:
         url = f"{URLS['kb_data']}/{item_id}"
         
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
-        
-        lines = [
-            f"## Digitalt Objekt: {item_id}",
-            ""
-        ]
-        
-        for key, value in data.items():
-            if not key.startswith("@") and value:
-                if isinstance(value, str):
-                    lines.append(f"**{key}:** {value}")
-                elif isinstance(value, dict):
-                    lines.append(f"**{key}:** {json.dumps(value, ensure_ascii=False)[:100]}")
-        
-        return "\n".join(lines) if len(lines) > 2 else f"Ingen data hittades för {item_id}."
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        return _format_kb_data_item(item_id, parse_json(response))
         
     except Exception as e:
         return handle_api_error(e, "kb_data_get_item")
 
 
+@mcp.tool()
+async def kb_data_get_items(
+    item_ids: Annotated[str, Field(description="Kommaseparerade objekt-ID:n, t.ex. 'bib/12345, bib/67890'")]
+) -> str:
+    """
+    Hämta flera digitala objekt från data.kb.se i ett anrop.
+    Objekten hämtas parallellt - snabbare än upprepade kb_data_get_item.
+    """
+    ids = [i.strip() for i in item_ids.split(",") if i.strip()]
+    
+    if not ids:
+        return "Ange minst ett objekt-ID (kommaseparerat för flera)."
+    
+    if len(ids) > 20:
+        return "Max 20 objekt-ID:n per anrop."
+    
+    # Begränsa antalet samtidiga anrop mot data.kb.se
+    semaphore = asyncio.Semaphore(Config.BATCH_CONCURRENCY)
+    
+    async def fetch(item_id: str) -> str:
+        async with semaphore:
+            try:
+                response = await api_client.get(
+                    f"{URLS['kb_data']}/{item_id}",
+                    accept=ACCEPT_JSONLD
+                )
+                return _format_kb_data_item(item_id, parse_json(response))
+            except Exception as e:
+                return handle_api_error(e, item_id)
+    
+    sections = await asyncio.gather(*(fetch(item_id) for item_id in ids))
+    
+    return f"# Digitala Objekt ({len(ids)} st)\n\n" + "\n\n".join(sections)
+
+
+def _sparql_literal(text: str) -> str:
+    """Citerar text som en SPARQL-strängliteral (skyddar mot injicerade citattecken)."""
+    escaped = (
+        text.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    return f'"{escaped}"'
+
+
 @mcp.tool()
 async def kb_data_search(
-    query: str = Field(description="Sökterm för digitaliserat material"),
-    collection: str = Field(default="", description="Begränsa till samling: 'smdb', 'dark', etc.")
+    query: Annotated[str, Field(description="Sökterm för digitaliserat material")],
+    collection: Annotated[str, Field(description="Begränsa till samling: 'smdb', 'dark', etc.")] = ""
 ) -> str:
     """
     Sök i KB:s digitaliserade samlingar.
     Hittar digitaliserade böcker, tidningar, kartor, bilder m.m.
     """
     try:
+        # Söktermen görs till gemener här så att endpointen bara behöver köra LCASE på titlarna
+        needle = _sparql_literal(query.lower())
+        
         # data.kb.se använder SPARQL för sökning
         sparql_query = f"""
         PREFIX dcterms: <http://purl.org/dc/terms/>
@@ -2062,17 +2263,18 @@ async def kb_data_search(
         SELECT ?item ?title ?description WHERE {{
             ?item dcterms:title ?title .
             OPTIONAL {{ ?item dcterms:description ?description }}
-            FILTER(CONTAINS(LCASE(?title), LCASE("{query}")))
+            FILTER(CONTAINS(LCASE(?title), {needle}))
         }} LIMIT 20
         """
         
         response = await api_client.post(
             f"{URLS['kb_data']}/sparql",
             data={"query": sparql_query},
-            accept="application/sparql-results+json"
+            accept=ACCEPT_SPARQL_JSON,
+            use_cache=True
         )
         
-        data = response.json()
+        data = parse_json(response)
         bindings = data.get("results", {}).get("bindings", [])
         
         lines = [
@@ -2096,7 +2298,7 @@ async def kb_data_search(
 
 @mcp.tool()
 async def kb_data_get_manifest(
-    item_id: str = Field(description="Objekt-ID för att hämta IIIF-manifest")
+    item_id: Annotated[str, Field(description="Objekt-ID för att hämta IIIF-manifest")]
 ) -> str:
     """
     Hämta IIIF-manifest för ett digitaliserat objekt.
@@ -2105,8 +2307,8 @@ async def kb_data_get_manifest(
     try:
         url = f"{URLS['kb_data']}/{item_id}/manifest"
         
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         lines = [
             f"## IIIF Manifest",
@@ -2129,31 +2331,42 @@ async def kb_data_get_manifest(
         return handle_api_error(e, "kb_data_get_manifest")
 
 
+# Accept-header per metadataformat i kb_data_get_metadata
+KB_DATA_ACCEPT_MAP = {
+    "jsonld": ACCEPT_JSONLD,
+    "rdf": ACCEPT_RDFXML,
+    "turtle": ACCEPT_TURTLE
+}
+
+
 @mcp.tool()
 async def kb_data_get_metadata(
-    item_id: str = Field(description="Objekt-ID"),
-    format: str = Field(default="jsonld", description="Format: 'jsonld', 'rdf', 'turtle'")
+    item_id: Annotated[str, Field(description="Objekt-ID")],
+    format: Annotated[str, Field(description="Format: 'jsonld', 'rdf', 'turtle'")] = "jsonld"
 ) -> str:
     """
     Hämta metadata för ett digitalt objekt i olika format.
     Stödjer JSON-LD, RDF/XML och Turtle.
     """
     try:
-        accept_map = {
-            "jsonld": "application/ld+json",
-            "rdf": "application/rdf+xml",
-            "turtle": "text/turtle"
-        }
-        
         url = f"{URLS['kb_data']}/{item_id}"
-        accept = accept_map.get(format, "application/ld+json")
+        accept = KB_DATA_ACCEPT_MAP.get(format, ACCEPT_JSONLD)
+        
+        # Finns JSON-LD redan i cache kan det konverteras lokalt
+        # (KB_LOCAL_RDF_CONVERSION, kräver rdflib)
+        if accept != KB_DATA_ACCEPT_MAP["jsonld"] and Config.LOCAL_RDF_CONVERSION:
+            cached = api_client.get_cached(url, accept=KB_DATA_ACCEPT_MAP["jsonld"])
+            if cached is not None:
+                text = await jsonld_to_rdf(parse_json(cached), format)
+                if text is not None:
+                    return f"```{format}\n{text[:5000]}\n```"
         
         response = await api_client.get(url, accept=accept)
         
         if format == "jsonld":
-            return json.dumps(response.json(), indent=2, ensure_ascii=False)
+            return dump_json(parse_json(response))
         else:
-            return f"```{format}\n{response.text[:5000]}\n```"
+            return f"```{format}\n{response_preview(response, 5000)}\n```"
         
     except Exception as e:
         return handle_api_error(e, "kb_data_get_metadata")
@@ -2165,9 +2378,9 @@ async def kb_data_get_metadata(
 
 @mcp.tool()
 async def swepub_search(
-    query: str = Field(description="Sökterm för svenska forskningspublikationer"),
-    limit: int = Field(default=10, ge=1, le=200, description="Max antal resultat"),
-    offset: int = Field(default=0, ge=0, description="Börja från resultat nummer")
+    query: Annotated[str, Field(description="Sökterm för svenska forskningspublikationer")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 10,
+    offset: Annotated[int, Field(ge=0, description="Börja från resultat nummer")] = 0
 ) -> str:
     """
     Sök svenska forskningspublikationer i Swepub.
@@ -2184,7 +2397,7 @@ async def swepub_search(
         }
         
         response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
+        data = parse_json(response)
         
         xsearch = data.get("xsearch", {})
         records = xsearch.get("records", 0)
@@ -2219,8 +2432,8 @@ async def swepub_search(
 
 @mcp.tool()
 async def swepub_search_author(
-    author_name: str = Field(description="Forskarens namn, t.ex. 'Johansson, Anna'"),
-    orcid: str = Field(default="", description="ORCID-ID (valfritt), t.ex. '0000-0002-1825-0097'")
+    author_name: Annotated[str, Field(description="Forskarens namn, t.ex. 'Johansson, Anna'")],
+    orcid: Annotated[str, Field(description="ORCID-ID (valfritt), t.ex. '0000-0002-1825-0097'")] = ""
 ) -> str:
     """
     Sök publikationer av en specifik forskare.
@@ -2241,7 +2454,7 @@ async def swepub_search_author(
         }
         
         response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
+        data = parse_json(response)
         
         xsearch = data.get("xsearch", {})
         items = xsearch.get("list", [])
@@ -2265,8 +2478,8 @@ async def swepub_search_author(
 
 @mcp.tool()
 async def swepub_search_affiliation(
-    organization: str = Field(description="Lärosäte, t.ex. 'Uppsala universitet', 'KTH', 'Karolinska Institutet'"),
-    limit: int = Field(default=20, ge=1, le=200, description="Max antal resultat")
+    organization: Annotated[str, Field(description="Lärosäte, t.ex. 'Uppsala universitet', 'KTH', 'Karolinska Institutet'")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök publikationer från ett specifikt lärosäte.
@@ -2284,7 +2497,7 @@ async def swepub_search_affiliation(
         }
         
         response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
+        data = parse_json(response)
         
         xsearch = data.get("xsearch", {})
         records = xsearch.get("records", 0)
@@ -2312,8 +2525,8 @@ async def swepub_search_affiliation(
 
 @mcp.tool()
 async def swepub_search_subject(
-    subject_code: str = Field(description="Ämnesklassning (SCB-kod eller text), t.ex. '101' för matematik eller 'medicin'"),
-    limit: int = Field(default=20, ge=1, le=200, description="Max antal resultat")
+    subject_code: Annotated[str, Field(description="Ämnesklassning (SCB-kod eller text), t.ex. '101' för matematik eller 'medicin'")],
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök publikationer inom ett forskningsämne.
@@ -2331,7 +2544,7 @@ async def swepub_search_subject(
         }
         
         response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
+        data = parse_json(response)
         
         xsearch = data.get("xsearch", {})
         records = xsearch.get("records", 0)
@@ -2354,9 +2567,13 @@ async def swepub_search_subject(
         return handle_api_error(e, "swepub_search_subject")
 
 
+# Identifierare som visas i swepub_get_publication
+PUBLICATION_ID_TYPES = frozenset({"DOI", "ISBN", "ISSN"})
+
+
 @mcp.tool()
 async def swepub_get_publication(
-    publication_id: str = Field(description="Publikations-ID eller URL från Swepub")
+    publication_id: Annotated[str, Field(description="Publikations-ID eller URL från Swepub")]
 ) -> str:
     """
     Hämta fullständig information om en forskningspublikation.
@@ -2366,8 +2583,8 @@ async def swepub_get_publication(
         # Försök hämta via Libris XL
         url = f"{URLS['libris_xl']}/{publication_id}"
         
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         main = data.get("mainEntity", data.get("@graph", [{}])[0] if "@graph" in data else data)
         
@@ -2386,12 +2603,10 @@ async def swepub_get_publication(
             if isinstance(summary, list) and summary:
                 lines.append(f"\n**Abstract:**\n{summary[0].get('label', '')[:500]}...")
         
-        if "identifiedBy" in main:
-            for ident in main["identifiedBy"]:
-                id_type = ident.get("@type", "")
-                value = ident.get("value", "")
-                if id_type in ["DOI", "ISBN", "ISSN"]:
-                    lines.append(f"**{id_type}:** {value}")
+        for ident in main.get("identifiedBy", ()):
+            id_type = ident.get("@type", "")
+            if id_type in PUBLICATION_ID_TYPES:
+                lines.append(f"**{id_type}:** {ident.get('value', '')}")
         
         return "\n".join(lines)
         
@@ -2401,8 +2616,8 @@ async def swepub_get_publication(
 
 @mcp.tool()
 async def swepub_export(
-    query: str = Field(description="Sökfråga för att exportera publikationer"),
-    format: str = Field(default="ris", description="Exportformat: 'ris' (Zotero), 'bibtex' (LaTeX)")
+    query: Annotated[str, Field(description="Sökfråga för att exportera publikationer")],
+    format: Annotated[str, Field(description="Exportformat: 'ris' (Zotero), 'bibtex' (LaTeX)")] = "ris"
 ) -> str:
     """
     Exportera Swepub-sökresultat till referenshanteringsformat.
@@ -2418,7 +2633,7 @@ async def swepub_export(
         }
         
         response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
+        data = parse_json(response)
         
         items = data.get("xsearch", {}).get("list", [])
         
@@ -2433,42 +2648,45 @@ async def swepub_export(
 
 def _format_ris(items: list) -> str:
     """Formatera till RIS-format."""
-    ris_lines = []
+    # En sträng per post (i stället för en per rad) - posterna skiljs av en tomrad
+    records = []
     
     for item in items:
-        ris_lines.extend([
-            "TY  - JOUR",
-            f"TI  - {item.get('title', '')}",
-            f"AU  - {item.get('creator', '')}",
-            f"PY  - {item.get('date', '')[:4] if item.get('date') else ''}",
-            f"PB  - {item.get('publisher', '')}",
-            "ER  - ",
-            ""
-        ])
+        date = item.get("date")
+        records.append(
+            "TY  - JOUR\n"
+            f"TI  - {item.get('title', '')}\n"
+            f"AU  - {item.get('creator', '')}\n"
+            f"PY  - {date[:4] if date else ''}\n"
+            f"PB  - {item.get('publisher', '')}\n"
+            "ER  - \n"
+        )
     
-    return "\n".join(ris_lines)
+    return "\n".join(records)
 
 
 def _format_bibtex(items: list) -> str:
     """Formatera till BibTeX-format."""
-    bibtex_lines = []
+    records = []
     
     for i, item in enumerate(items):
-        author = item.get('creator', 'Unknown')
-        year = item.get('date', '')[:4] if item.get('date') else '0000'
-        key = f"{author.split(',')[0].lower() if ',' in author else author.split()[0].lower()}{year}_{i}"
-        
-        bibtex_lines.extend([
-            f"@article{{{key},",
-            f"  title = {{{item.get('title', '')}}},",
-            f"  author = {{{author}}},",
-            f"  year = {{{year}}},",
-            f"  publisher = {{{item.get('publisher', '')}}}",
-            "}",
-            ""
-        ])
+        author = item.get("creator", "Unknown")
+        date = item.get("date")
+        year = date[:4] if date else "0000"
+        # Nyckel: efternamn (före komma) eller första ordet, i gemener
+        surname = author.partition(",")[0] if "," in author else (author.split(None, 1) or ["unknown"])[0]
+        key = f"{surname.lower()}{year}_{i}"
+        
+        records.append(
+            f"@article{{{key},\n"
+            f"  title = {{{item.get('title', '')}}},\n"
+            f"  author = {{{author}}},\n"
+            f"  year = {{{year}}},\n"
+            f"  publisher = {{{item.get('publisher', '')}}}\n"
+            "}\n"
+        )
     
-    return "\n".join(bibtex_lines)
+    return "\n".join(records)
 
 
 # ============================================================================
@@ -2477,8 +2695,8 @@ def _format_bibtex(items: list) -> str:
 
 @mcp.tool()
 async def idkb_get_entity(
-    entity_path: str = Field(description="Entitetssökväg, t.ex. 'vocab/Person', 'term/sao/Politik'"),
-    format: str = Field(default="markdown", description="Utdataformat: 'markdown' eller 'json'")
+    entity_path: Annotated[str, Field(description="Entitetssökväg, t.ex. 'vocab/Person', 'term/sao/Politik'")],
+    format: Annotated[str, Field(description="Utdataformat: 'markdown' eller 'json'")] = "markdown"
 ) -> str:
     """
     Hämta en entitet/begrepp från id.kb.se.
@@ -2487,11 +2705,11 @@ async def idkb_get_entity(
     try:
         url = f"{URLS['idkb']}/{entity_path}"
         
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         if format == "json":
-            return json.dumps(data, indent=2, ensure_ascii=False)
+            return dump_json(data)
         
         lines = [
             f"## Entitet: {entity_path}",
@@ -2522,9 +2740,9 @@ async def idkb_get_entity(
 
 @mcp.tool()
 async def idkb_search(
-    query: str = Field(description="Sökterm för auktoriteter och begrepp"),
-    entity_type: str = Field(default="", description="Entitetstyp: 'Person', 'Organization', 'Subject', 'Work'"),
-    limit: int = Field(default=20, ge=1, le=200, description="Max antal resultat")
+    query: Annotated[str, Field(description="Sökterm för auktoriteter och begrepp")],
+    entity_type: Annotated[str, Field(description="Entitetstyp: 'Person', 'Organization', 'Subject', 'Work'")] = "",
+    limit: Annotated[int, Field(ge=1, le=200, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök auktoriteter, ämnesord och begrepp i id.kb.se.
@@ -2540,8 +2758,8 @@ async def idkb_search(
             params["@type"] = entity_type
         
         url = f"{URLS['idkb']}/find"
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, params=params, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         items = data.get("items", [])
         total = data.get("totalItems", len(items))
@@ -2569,8 +2787,8 @@ async def idkb_search(
 
 @mcp.tool()
 async def idkb_get_vocab_term(
-    vocab: str = Field(description="Vokabulär, t.ex. 'sao' (Svenska ämnesord), 'saogf' (Genre/form)"),
-    term: str = Field(description="Term att slå upp, t.ex. 'Historia', 'Romaner'")
+    vocab: Annotated[str, Field(description="Vokabulär, t.ex. 'sao' (Svenska ämnesord), 'saogf' (Genre/form)")],
+    term: Annotated[str, Field(description="Term att slå upp, t.ex. 'Historia', 'Romaner'")]
 ) -> str:
     """
     Hämta en specifik term från ett kontrollerat vokabulär.
@@ -2579,8 +2797,8 @@ async def idkb_get_vocab_term(
     try:
         url = f"{URLS['idkb']}/term/{vocab}/{term}"
         
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
         
         lines = [
             f"## Term: {term}",
@@ -2619,8 +2837,8 @@ async def idkb_get_vocab_term(
 
 @mcp.tool()
 async def idkb_list_vocab(
-    vocab: str = Field(description="Vokabulär att lista, t.ex. 'sao', 'saogf', 'barn'"),
-    limit: int = Field(default=50, ge=1, le=500, description="Max antal termer")
+    vocab: Annotated[str, Field(description="Vokabulär att lista, t.ex. 'sao', 'saogf', 'barn'")],
+    limit: Annotated[int, Field(ge=1, le=500, description="Max antal termer")] = 50
 ) -> str:
     """
     Lista termer i ett kontrollerat vokabulär.
@@ -2633,8 +2851,12 @@ async def idkb_list_vocab(
             "_limit": limit
         }
         
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
+        # Listning av ett vokabulär (ingen fritextsökning) - ändras sällan, så
+        # samma långa livslängd som termerna trots att /find annars cachas kort
+        response = await api_client.get(
+            url, params=params, accept=ACCEPT_JSONLD, cache_ttl=Config.IDKB_CACHE_TTL
+        )
+        data = parse_json(response)
         
         items = data.get("items", [])
         
@@ -2658,24 +2880,115 @@ async def idkb_list_vocab(
 # 8. SPARQL (4 verktyg)
 # ============================================================================
 
+# Lexikala delar av en SPARQL-fråga. Kommentarer, strängar, IRI:er, variabler
+# och prefixade namn matchas som egna token så att nyckelord inuti dem
+# (t.ex. "Drop all", ?copy eller dc:limit) inte misstas för syntax.
+_SPARQL_TOKEN_RE = re.compile(
+    r"(?P<skip>"
+    r"#[^\n]*"                                    # kommentar
+    r'|"""(?:[^"\\]|\\.|"(?!""))*"""'             # långa strängar
+    r"|'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r'|"(?:[^"\\\n]|\\.)*"'                       # strängar
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r"|<[^<>\"{}|^`\\\x00-\x20]*>"                # IRI
+    r"|[?$]\w+"                                   # variabel
+    r")"
+    r"|(?P<word>[A-Za-z_][\w-]*(?::[^\s{}()<>,;\"']*)?|:[^\s{}()<>,;\"']*)"
+    r"|(?P<punct>[{};])"
+)
+# Nyckelord som inleder en SPARQL Update-operation
+_SPARQL_UPDATE_KEYWORDS = frozenset({
+    "INSERT", "DELETE", "WITH", "LOAD", "CLEAR", "DROP", "CREATE", "ADD", "MOVE", "COPY"
+})
+SPARQL_UPDATE_MESSAGE = "Endast läsande frågor stöds (SELECT, ASK, CONSTRUCT, DESCRIBE)."
+
+
+def _sparql_top_level(query: str) -> Iterator[Tuple[str, int]]:
+    """
+    Ger nyckelord och skiljetecken på yttersta nivån (utanför {...}) med
+    position. Kommentarer, strängar, IRI:er, variabler och prefixade namn
+    hoppas över.
+    """
+    depth = 0
+    for match in _SPARQL_TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        if kind == "skip":
+            continue
+        token = match.group(kind)
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth = max(depth - 1, 0)
+        elif depth == 0 and ":" not in token:
+            yield token.upper(), match.start()
+
+
+def _sparql_operations(query: str) -> Iterator[Tuple[str, int]]:
+    """
+    Ger första nyckelordet i varje operation (efter PREFIX/BASE) med position.
+    Operationer i en SPARQL Update-begäran skiljs åt med ';' på yttersta nivån.
+    """
+    at_start = True
+    for token, position in _sparql_top_level(query):
+        if token == ";":
+            at_start = True
+        elif at_start and token not in ("PREFIX", "BASE"):
+            at_start = False
+            yield token, position
+
+
+def _is_sparql_update(query: str) -> bool:
+    """True om någon operation i frågan är en SPARQL Update-operation."""
+    return any(token in _SPARQL_UPDATE_KEYWORDS for token, _ in _sparql_operations(query))
+
+
+def _ensure_limit(query: str, default: int) -> str:
+    """
+    Lägger till LIMIT i en SELECT-fråga som saknar egen LIMIT på yttersta nivån.
+
+    LIMIT i delfrågor, kommentarer och strängar räknas inte. En avslutande
+    VALUES-klausul måste stå sist, så LIMIT placeras före den.
+    """
+    form = next(_sparql_operations(query), ("", 0))[0]
+    if form != "SELECT":
+        return query
+
+    values_at = None
+    for token, position in _sparql_top_level(query):
+        if token == "LIMIT":
+            return query
+        if token == "VALUES":
+            values_at = position
+
+    logger.debug("SPARQL utan LIMIT, lägger till LIMIT %d", default)
+    # Ny rad så att en avslutande #-kommentar inte slukar LIMIT
+    if values_at is not None:
+        return f"{query[:values_at].rstrip()}\nLIMIT {default}\n{query[values_at:]}"
+    return f"{query.rstrip()}\nLIMIT {default}"
+
+
 @mcp.tool()
 async def sparql_query(
-    query: str = Field(description="SPARQL SELECT-fråga för att hämta data från Libris länkade data"),
-    format: str = Field(default="markdown", description="Utdataformat: 'markdown' eller 'json'")
+    query: Annotated[str, Field(description="SPARQL SELECT-fråga för att hämta data från Libris länkade data")],
+    format: Annotated[str, Field(description="Utdataformat: 'markdown' eller 'json'")] = "markdown"
 ) -> str:
     """
     Kör en SPARQL SELECT-fråga mot Libris länkade data.
     Kraftfullt verktyg för komplexa analyser och datautvinning.
     """
+    if _is_sparql_update(query):
+        return SPARQL_UPDATE_MESSAGE
+
     try:
         response = await api_client.post(
             URLS["libris_sparql"],
-            data={"query": query},
-            accept="application/sparql-results+json"
+            data={"query": _ensure_limit(query, Config.SPARQL_DEFAULT_LIMIT)},
+            accept=ACCEPT_SPARQL_JSON,
+            use_cache=True
         )
         
-        data = response.json()
-        return format_sparql_results(data, format)
+        data = parse_json(response)
+        return await format_async(format_sparql_results, data, format)
         
     except Exception as e:
         return handle_api_error(e, "sparql_query")
@@ -2683,7 +2996,7 @@ async def sparql_query(
 
 @mcp.tool()
 async def sparql_describe(
-    resource_uri: str = Field(description="URI för resursen att beskriva, t.ex. 'https://libris.kb.se/bib/12345'")
+    resource_uri: Annotated[str, Field(description="URI för resursen att beskriva, t.ex. 'https://libris.kb.se/bib/12345'")]
 ) -> str:
     """
     Beskriv en resurs i RDF-format via SPARQL DESCRIBE.
@@ -2695,43 +3008,85 @@ async def sparql_describe(
         response = await api_client.post(
             URLS["libris_sparql"],
             data={"query": query},
-            accept="application/ld+json"
+            accept=ACCEPT_JSONLD,
+            use_cache=True
         )
         
-        data = response.json()
-        return json.dumps(data, indent=2, ensure_ascii=False)[:5000]
+        data = parse_json(response)
+        return dump_json(data)[:5000]
         
     except Exception as e:
         return handle_api_error(e, "sparql_describe")
 
 
+# Övre gräns för sparql_count(mode='approx') - räkningen avbryts här
+SPARQL_APPROX_LIMIT = 100000
+
+SPARQL_COUNT_MODES = ("exact", "exists", "approx")
+
+
 @mcp.tool()
 async def sparql_count(
-    query: str = Field(description="SPARQL WHERE-klausul att räkna, t.ex. '?s a <http://purl.org/ontology/bibo/Book>'")
+    query: Annotated[str, Field(description="SPARQL WHERE-klausul att räkna, t.ex. '?s a <http://purl.org/ontology/bibo/Book>'")],
+    mode: Annotated[str, Field(description="Läge: 'exact' (exakt antal), 'exists' (finns någon träff?) eller 'approx' (räkna upp till 100 000)")] = "exact"
 ) -> str:
     """
     Räkna antal resultat för en SPARQL-pattern.
     Snabbt sätt att få statistik utan att hämta all data.
+    Breda mönster kan ta lång tid med 'exact' - använd 'exists' eller 'approx'.
     """
+    if mode not in SPARQL_COUNT_MODES:
+        return f"Okänt läge: '{mode}'. Tillgängliga: {', '.join(SPARQL_COUNT_MODES)}"
+
     try:
-        count_query = f"""
+        if mode == "exists":
+            count_query = f"""
+        ASK {{
+            {query}
+        }}
+        """
+        elif mode == "approx":
+            # Delfråga med LIMIT - servern slutar leta vid gränsen
+            count_query = f"""
+        SELECT (COUNT(*) AS ?count) WHERE {{
+            SELECT * WHERE {{
+                {query}
+            }}
+            LIMIT {SPARQL_APPROX_LIMIT}
+        }}
+        """
+        else:
+            count_query = f"""
         SELECT (COUNT(*) AS ?count) WHERE {{
             {query}
         }}
         """
         
+        # Mönstret kan avsluta blocket och lägga till egna operationer
+        if _is_sparql_update(count_query):
+            return SPARQL_UPDATE_MESSAGE
+
         response = await api_client.post(
             URLS["libris_sparql"],
             data={"query": count_query},
-            accept="application/sparql-results+json"
+            accept=ACCEPT_SPARQL_JSON,
+            use_cache=True
         )
         
-        data = response.json()
+        data = parse_json(response)
+
+        if mode == "exists":
+            if "boolean" in data:
+                return "**Finns:** Ja" if data["boolean"] else "**Finns:** Nej"
+            return "Kunde inte avgöra om resultat finns."
+
         bindings = data.get("results", {}).get("bindings", [])
         
         if bindings:
-            count = bindings[0].get("count", {}).get("value", "0")
-            return f"**Antal:** {int(count):,}"
+            count = int(bindings[0].get("count", {}).get("value", "0"))
+            if mode == "approx" and count >= SPARQL_APPROX_LIMIT:
+                return f"**Antal:** ≥ {SPARQL_APPROX_LIMIT:,}"
+            return f"**Antal:** {count:,}"
         
         return "Kunde inte räkna resultat."
         
@@ -2739,18 +3094,11 @@ async def sparql_count(
         return handle_api_error(e, "sparql_count")
 
 
-@mcp.tool()
-async def sparql_templates(
-    category: str = Field(default="all", description="Kategori: 'all', 'books', 'authors', 'subjects', 'statistics'")
-) -> str:
-    """
-    Visa fördefinierade SPARQL-frågemallar.
-    Använd som utgångspunkt för egna analyser.
-    """
-    templates = {
-        "books": {
-            "name": "Böcker per år",
-            "query": """SELECT ?year (COUNT(?book) AS ?count)
+# Fördefinierade SPARQL-frågemallar för sparql_templates
+SPARQL_TEMPLATES = {
+    "books": {
+        "name": "Böcker per år",
+        "query": """SELECT ?year (COUNT(?book) AS ?count)
 WHERE {
   ?book a <http://purl.org/ontology/bibo/Book> ;
         <http://purl.org/dc/terms/date> ?year .
@@ -2758,46 +3106,45 @@ WHERE {
 GROUP BY ?year
 ORDER BY ?year
 LIMIT 100"""
-        },
-        "authors": {
-            "name": "Mest produktiva författare",
-            "query": """SELECT ?author (COUNT(?work) AS ?count)
+    },
+    "authors": {
+        "name": "Mest produktiva författare",
+        "query": """SELECT ?author (COUNT(?work) AS ?count)
 WHERE {
   ?work <http://purl.org/dc/terms/creator> ?author .
 }
 GROUP BY ?author
 ORDER BY DESC(?count)
 LIMIT 50"""
-        },
-        "subjects": {
-            "name": "Populära ämnesord",
-            "query": """SELECT ?subject (COUNT(?work) AS ?count)
+    },
+    "subjects": {
+        "name": "Populära ämnesord",
+        "query": """SELECT ?subject (COUNT(?work) AS ?count)
 WHERE {
   ?work <http://purl.org/dc/terms/subject> ?subject .
 }
 GROUP BY ?subject
 ORDER BY DESC(?count)
 LIMIT 50"""
-        },
-        "statistics": {
-            "name": "Databasstatistik",
-            "query": """SELECT ?type (COUNT(?s) AS ?count)
+    },
+    "statistics": {
+        "name": "Databasstatistik",
+        "query": """SELECT ?type (COUNT(?s) AS ?count)
 WHERE {
   ?s a ?type .
 }
 GROUP BY ?type
 ORDER BY DESC(?count)
 LIMIT 20"""
-        }
     }
-    
-    if category != "all" and category in templates:
-        t = templates[category]
-        return f"## {t['name']}\n\n```sparql\n{t['query']}\n```"
-    
+}
+
+
+def _render_sparql_templates() -> str:
+    """Renderar alla SPARQL-mallar som Markdown (görs en gång vid import)."""
     lines = ["## SPARQL Frågemallar", ""]
     
-    for key, t in templates.items():
+    for key, t in SPARQL_TEMPLATES.items():
         lines.append(f"### {t['name']} (`{key}`)")
         lines.append(f"```sparql\n{t['query']}\n```")
         lines.append("")
@@ -2805,15 +3152,36 @@ LIMIT 20"""
     return "\n".join(lines)
 
 
+_SPARQL_TEMPLATES_MD = _render_sparql_templates()
+_SPARQL_TEMPLATE_MD = {
+    key: f"## {t['name']}\n\n```sparql\n{t['query']}\n```"
+    for key, t in SPARQL_TEMPLATES.items()
+}
+
+
+@mcp.tool()
+async def sparql_templates(
+    category: Annotated[str, Field(description="Kategori: 'all', 'books', 'authors', 'subjects', 'statistics'")] = "all"
+) -> str:
+    """
+    Visa fördefinierade SPARQL-frågemallar.
+    Använd som utgångspunkt för egna analyser.
+    """
+    if category != "all" and category in SPARQL_TEMPLATES:
+        return _SPARQL_TEMPLATE_MD[category]
+    
+    return _SPARQL_TEMPLATES_MD
+
+
 # ============================================================================
 # 9. BIBLIOGRAFI-EXPORT (5 verktyg)
 # ============================================================================
 
 @mcp.tool()
 async def export_author_bibliography(
-    author_name: str = Field(description="Författarens namn, t.ex. 'Lindgren, Astrid'"),
-    format: str = Field(default="ris", description="Exportformat: 'ris', 'bibtex', 'markdown'"),
-    max_results: int = Field(default=50, ge=1, le=200, description="Max antal verk")
+    author_name: Annotated[str, Field(description="Författarens namn, t.ex. 'Lindgren, Astrid'")],
+    format: Annotated[str, Field(description="Exportformat: 'ris', 'bibtex', 'markdown'")] = "ris",
+    max_results: Annotated[int, Field(ge=1, le=200, description="Max antal verk")] = 50
 ) -> str:
     """
     Exportera en författarbibliografi i referenshanteringsformat.
@@ -2828,7 +3196,7 @@ async def export_author_bibliography(
         }
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
+        data = parse_json(response)
         items = data.get("xsearch", {}).get("list", [])
         
         if format == "bibtex":
@@ -2847,9 +3215,9 @@ async def export_author_bibliography(
 
 @mcp.tool()
 async def export_subject_bibliography(
-    subject: str = Field(description="Ämnesord, t.ex. 'klimatförändringar', 'svensk historia'"),
-    format: str = Field(default="ris", description="Exportformat: 'ris', 'bibtex'"),
-    max_results: int = Field(default=50, ge=1, le=200, description="Max antal verk")
+    subject: Annotated[str, Field(description="Ämnesord, t.ex. 'klimatförändringar', 'svensk historia'")],
+    format: Annotated[str, Field(description="Exportformat: 'ris', 'bibtex'")] = "ris",
+    max_results: Annotated[int, Field(ge=1, le=200, description="Max antal verk")] = 50
 ) -> str:
     """
     Exportera en ämnesbibliografi för ett forskningsområde.
@@ -2864,7 +3232,7 @@ async def export_subject_bibliography(
         }
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
+        data = parse_json(response)
         items = data.get("xsearch", {}).get("list", [])
         
         if format == "bibtex":
@@ -2878,8 +3246,8 @@ async def export_subject_bibliography(
 
 @mcp.tool()
 async def export_search_results(
-    query: str = Field(description="Libris-sökfråga"),
-    format: str = Field(default="ris", description="Exportformat: 'ris', 'bibtex', 'json'")
+    query: Annotated[str, Field(description="Libris-sökfråga")],
+    format: Annotated[str, Field(description="Exportformat: 'ris', 'bibtex', 'json', 'ndjson' (en post per rad)")] = "ris"
 ) -> str:
     """
     Exportera godtyckliga sökresultat till referenshanteringsformat.
@@ -2894,11 +3262,13 @@ async def export_search_results(
         }
         
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
+        data = parse_json(response)
         items = data.get("xsearch", {}).get("list", [])
         
         if format == "json":
-            return json.dumps(items, indent=2, ensure_ascii=False)
+            return dump_json(items)
+        elif format == "ndjson":
+            return dump_ndjson(items)
         elif format == "bibtex":
             return _format_bibtex(items)
         else:
@@ -2908,36 +3278,87 @@ async def export_search_results(
         return handle_api_error(e, "export_search_results")
 
 
+# Max antal poster i export_publication_list
+PUBLICATION_LIST_MAX = 20
+
+# Giltigt Libris-post-ID (numeriskt bib-ID eller Libris XL-ID) - stoppar även
+# sökoperatorer från att hamna i den sammanslagna OR-frågan
+_RECORD_ID_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _record_key(identifier: str) -> str:
+    """Post-ID ur en Libris-identifier, t.ex. 'http://libris.kb.se/bib/12345' -> '12345'."""
+    return identifier.rstrip("/").rsplit("/", 1)[-1]
+
+
+async def _lookup_record(record_id: str) -> Optional[Dict[str, Any]]:
+    """Hämtar en enskild Libris-post via id:-sökning (None om den inte hittas)."""
+    params = {**XSEARCH_BASE_PARAMS, "query": f"id:{record_id}", "n": 1}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    item_list = parse_json(response).get("xsearch", {}).get("list", [])
+    return item_list[0] if item_list else None
+
+
 @mcp.tool()
 async def export_publication_list(
-    record_ids: str = Field(description="Kommaseparerade post-ID:n, t.ex. '12345,67890,11111'"),
-    format: str = Field(default="ris", description="Exportformat: 'ris', 'bibtex'")
+    record_ids: Annotated[str, Field(description="Kommaseparerade post-ID:n, t.ex. '12345,67890,11111'")],
+    format: Annotated[str, Field(description="Exportformat: 'ris', 'bibtex'")] = "ris"
 ) -> str:
     """
     Skapa en publikationslista från specifika post-ID:n.
     Använd för att sammanställa handplockade referenser.
     """
     try:
-        ids = [id.strip() for id in record_ids.split(",")]
-        items = []
-        
-        for record_id in ids[:20]:  # Max 20 poster
-            try:
-                params = {
-                    "query": f"id:{record_id}",
-                    "n": 1,
-                    "format": "json",
-                    "format_extended": "true"
-                }
-                response = await api_client.get(URLS["libris_xsearch"], params=params)
-                data = response.json()
-                item_list = data.get("xsearch", {}).get("list", [])
-                if item_list:
-                    items.append(item_list[0])
-            except Exception:
-                continue
+        ids = [
+            record_id for record_id in (id.strip() for id in record_ids.split(","))
+            if _RECORD_ID_RE.match(record_id)
+        ][:PUBLICATION_LIST_MAX]
+        if not ids:
+            return "Inga giltiga post-ID:n."
+        
+        unique_ids = list(dict.fromkeys(ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        
+        # Alla ID:n i en fråga istället för ett anrop per post
+        combined_error: Optional[Exception] = None
+        try:
+            params = {
+                **XSEARCH_BASE_PARAMS,
+                "query": " OR ".join(f"id:{record_id}" for record_id in unique_ids),
+                "n": len(unique_ids)
+            }
+            response = await api_client.get(URLS["libris_xsearch"], params=params)
+            for item in parse_json(response).get("xsearch", {}).get("list", []):
+                identifier = item.get("identifier")
+                if isinstance(identifier, str):
+                    found.setdefault(_record_key(identifier), item)
+        except Exception as e:
+            # Posterna slås upp en och en nedan
+            combined_error = e
+            logger.warning("Samlad ID-sökning misslyckades, slår upp poster var för sig: %s", e)
+        
+        # Poster som inte kom med i den samlade frågan slås upp var för sig
+        missing = [record_id for record_id in unique_ids if record_id not in found]
+        lookup_errors: List[BaseException] = []
+        if missing:
+            lookups = await asyncio.gather(
+                *(_lookup_record(record_id) for record_id in missing),
+                return_exceptions=True
+            )
+            for record_id, outcome in zip(missing, lookups):
+                if isinstance(outcome, BaseException):
+                    lookup_errors.append(outcome)
+                    logger.debug("Uppslagning av post %s misslyckades: %s", record_id, outcome)
+                elif outcome is not None:
+                    found[record_id] = outcome
+        
+        # Samma ordning som i record_ids
+        items = [found[record_id] for record_id in ids if record_id in found]
         
         if not items:
+            # Misslyckades alla uppslagningar är det ett fel, inte okända ID:n
+            if lookup_errors and len(lookup_errors) == len(missing):
+                return handle_api_error(combined_error or lookup_errors[0], "export_publication_list")
             return "Inga poster hittades för angivna ID:n."
         
         if format == "bibtex":
@@ -2972,6 +3393,12 @@ async def export_formats_info() -> str:
 - **Filtyp:** .json
 - **Fördel:** Maskinläsbar, full metadata
 
+### NDJSON (JSON Lines)
+- **Användning:** Radvis bearbetning, t.ex. med jq eller pandas
+- **Filtyp:** .jsonl
+- **Fördel:** En post per rad, kompaktare än indenterad JSON
+- **Verktyg:** `export_search_results(format="ndjson")`
+
 ### Markdown
 - **Användning:** Dokumentation, webbsidor
 - **Filtyp:** .md
@@ -2991,83 +3418,98 @@ async def export_formats_info() -> str:
 # NYA FÖRBÄTTRADE VERKTYG
 # ============================================================================
 
+async def _combined_libris(query: str, limit: int) -> List[str]:
+    """Libris-delen av combined_search."""
+    params = {"query": query, "n": limit, "format": "json"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    data = parse_json(response)
+    xsearch = data.get("xsearch", {})
+    total = xsearch.get("records", 0)
+    items = xsearch.get("list", [])
+
+    lines = [f"## 📚 Libris (böcker & media)", f"**Totalt:** {total} träffar\n"]
+    for i, item in enumerate(items, 1):
+        title = item.get("title", "Utan titel")
+        creator = item.get("creator", "Okänd")
+        date = item.get("date", "")
+        lines.append(f"{i}. **{title}** - {creator} ({date})")
+    lines.append("")
+    return lines
+
+
+async def _combined_ksamsok(query: str, limit: int) -> List[str]:
+    """K-samsök-delen av combined_search."""
+    params = {"method": "search", "query": f"text={query}", "hitsPerPage": limit}
+    response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+    data = parse_ksamsok_xml(response.content)
+    total = data.get("total_hits", 0)
+    records = data.get("records", [])
+
+    lines = [f"## 🏛️ K-samsök (kulturarv)", f"**Totalt:** {total} objekt\n"]
+    for i, record in enumerate(records, 1):
+        label = record.get("label", "Utan benämning")
+        obj_type = record.get("type", "Okänd typ")
+        lines.append(f"{i}. **{label}** ({obj_type})")
+    lines.append("")
+    return lines
+
+
+async def _combined_swepub(query: str, limit: int) -> List[str]:
+    """Swepub-delen av combined_search."""
+    params = {"query": query, "database": "swepub", "n": limit, "format": "json"}
+    response = await api_client.get(URLS["swepub"], params=params)
+    data = parse_json(response)
+    xsearch = data.get("xsearch", {})
+    total = xsearch.get("records", 0)
+    items = xsearch.get("list", [])
+
+    lines = [f"## 🎓 Swepub (forskning)", f"**Totalt:** {total} publikationer\n"]
+    for i, item in enumerate(items, 1):
+        title = item.get("title", "Utan titel")
+        creator = item.get("creator", "Okänd")
+        lines.append(f"{i}. **{title}** - {creator}")
+    lines.append("")
+    return lines
+
+
 @mcp.tool()
 async def combined_search(
-    query: str = Field(description="Sökterm för sökning i flera databaser samtidigt"),
-    include_libris: bool = Field(default=True, description="Inkludera Libris (böcker)"),
-    include_ksamsok: bool = Field(default=True, description="Inkludera K-samsök (kulturarv)"),
-    include_swepub: bool = Field(default=True, description="Inkludera Swepub (forskning)"),
-    limit_per_source: int = Field(default=5, ge=1, le=20, description="Max resultat per källa")
+    query: Annotated[str, Field(description="Sökterm för sökning i flera databaser samtidigt")],
+    include_libris: Annotated[bool, Field(description="Inkludera Libris (böcker)")] = True,
+    include_ksamsok: Annotated[bool, Field(description="Inkludera K-samsök (kulturarv)")] = True,
+    include_swepub: Annotated[bool, Field(description="Inkludera Swepub (forskning)")] = True,
+    limit_per_source: Annotated[int, Field(ge=1, le=20, description="Max resultat per källa")] = 5
 ) -> str:
     """
     Sök i flera KB-databaser samtidigt med en enda fråga.
     Perfekt för att få en snabb överblick över vad som finns tillgängligt.
     """
-    results = []
-
-    # Libris
+    # (rubrik vid fel, hämtningsfunktion) per aktiverad källa
+    sources = []
     if include_libris:
-        try:
-            params = {"query": query, "n": limit_per_source, "format": "json", "format_extended": "true"}
-            response = await api_client.get(URLS["libris_xsearch"], params=params)
-            data = response.json()
-            xsearch = data.get("xsearch", {})
-            total = xsearch.get("records", 0)
-            items = xsearch.get("list", [])
-
-            results.append(f"## 📚 Libris (böcker & media)")
-            results.append(f"**Totalt:** {total} träffar\n")
-            for i, item in enumerate(items, 1):
-                title = item.get("title", "Utan titel")
-                creator = item.get("creator", "Okänd")
-                date = item.get("date", "")
-                results.append(f"{i}. **{title}** - {creator} ({date})")
-            results.append("")
-        except Exception as e:
-            results.append(f"## 📚 Libris\n❌ Fel: {e}\n")
-
-    # K-samsök
+        sources.append(("## 📚 Libris", _combined_libris))
     if include_ksamsok:
-        try:
-            params = {"method": "search", "query": f"text={query}", "hitsPerPage": limit_per_source}
-            response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-            data = parse_ksamsok_xml(response.text)
-            total = data.get("total_hits", 0)
-            records = data.get("records", [])
-
-            results.append(f"## 🏛️ K-samsök (kulturarv)")
-            results.append(f"**Totalt:** {total} objekt\n")
-            for i, record in enumerate(records, 1):
-                label = record.get("label", "Utan benämning")
-                obj_type = record.get("type", "Okänd typ")
-                results.append(f"{i}. **{label}** ({obj_type})")
-            results.append("")
-        except Exception as e:
-            results.append(f"## 🏛️ K-samsök\n❌ Fel: {e}\n")
-
-    # Swepub
+        sources.append(("## 🏛️ K-samsök", _combined_ksamsok))
     if include_swepub:
-        try:
-            params = {"query": query, "database": "swepub", "n": limit_per_source, "format": "json"}
-            response = await api_client.get(URLS["swepub"], params=params)
-            data = response.json()
-            xsearch = data.get("xsearch", {})
-            total = xsearch.get("records", 0)
-            items = xsearch.get("list", [])
-
-            results.append(f"## 🎓 Swepub (forskning)")
-            results.append(f"**Totalt:** {total} publikationer\n")
-            for i, item in enumerate(items, 1):
-                title = item.get("title", "Utan titel")
-                creator = item.get("creator", "Okänd")
-                results.append(f"{i}. **{title}** - {creator}")
-            results.append("")
-        except Exception as e:
-            results.append(f"## 🎓 Swepub\n❌ Fel: {e}\n")
+        sources.append(("## 🎓 Swepub", _combined_swepub))
 
-    if not results:
+    if not sources:
         return "Inga sökningar utförda. Aktivera minst en datakälla."
 
+    # Källorna är oberoende - kör dem parallellt så att total tid ≈ långsammaste källan.
+    # Tidsgränser och retry hanteras per anrop i api_client.
+    outcomes = await asyncio.gather(
+        *(fetch(query, limit_per_source) for _, fetch in sources),
+        return_exceptions=True
+    )
+
+    results = []
+    for (heading, _), outcome in zip(sources, outcomes):
+        if isinstance(outcome, BaseException):
+            results.append(f"{heading}\n❌ {handle_api_error(outcome)}\n")
+        else:
+            results.extend(outcome)
+
     return f"# Kombinerad sökning: \"{query}\"\n\n" + "\n".join(results)
 
 
@@ -3111,6 +3553,43 @@ ksamsok_search(query='countyName="Gotlands län" AND itemType=Runestone')
 """
 
 
+async def _stats_libris() -> int:
+    """Antal bibliografiska poster i Libris."""
+    params = {"query": "*", "n": 1, "format": "json"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    return parse_json(response).get("xsearch", {}).get("records", 0)
+
+
+async def _stats_ksamsok() -> int:
+    """Antal kulturarvsobjekt i K-samsök."""
+    params = {"method": "search", "query": "*", "hitsPerPage": 1}
+    response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+    return parse_ksamsok_xml(response.content).get("total_hits", 0)
+
+
+async def _stats_swepub() -> int:
+    """Antal forskningspublikationer i Swepub."""
+    params = {"query": "*", "database": "swepub", "n": 1, "format": "json"}
+    response = await api_client.get(URLS["swepub"], params=params)
+    return parse_json(response).get("xsearch", {}).get("records", 0)
+
+
+async def _stats_idkb() -> int:
+    """Antal auktoriteter i id.kb.se."""
+    params = {"q": "*", "_limit": 1}
+    response = await api_client.get(f"{URLS['idkb']}/find", params=params, accept=ACCEPT_JSONLD)
+    return parse_json(response).get("totalItems", 0)
+
+
+# (etikett, enhet, hämtningsfunktion) per databas i quick_stats
+QUICK_STATS_SOURCES = [
+    ("📚 **Libris:**", "bibliografiska poster", _stats_libris),
+    ("🏛️ **K-samsök:**", "kulturarvsobjekt", _stats_ksamsok),
+    ("🎓 **Swepub:**", "forskningspublikationer", _stats_swepub),
+    ("📖 **id.kb.se:**", "auktoriteter", _stats_idkb),
+]
+
+
 @mcp.tool()
 async def quick_stats() -> str:
     """
@@ -3119,45 +3598,17 @@ async def quick_stats() -> str:
     """
     lines = ["## KB API Snabbstatistik\n"]
 
-    # Test Libris
-    try:
-        params = {"query": "*", "n": 1, "format": "json"}
-        response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        total = data.get("xsearch", {}).get("records", 0)
-        lines.append(f"📚 **Libris:** {total:,} bibliografiska poster ✅")
-    except Exception:
-        lines.append("📚 **Libris:** Otillgänglig ❌")
-
-    # Test K-samsök
-    try:
-        params = {"method": "search", "query": "*", "hitsPerPage": 1}
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
-        total = data.get("total_hits", 0)
-        lines.append(f"🏛️ **K-samsök:** {total:,} kulturarvsobjekt ✅")
-    except Exception:
-        lines.append("🏛️ **K-samsök:** Otillgänglig ❌")
-
-    # Test Swepub
-    try:
-        params = {"query": "*", "database": "swepub", "n": 1, "format": "json"}
-        response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
-        total = data.get("xsearch", {}).get("records", 0)
-        lines.append(f"🎓 **Swepub:** {total:,} forskningspublikationer ✅")
-    except Exception:
-        lines.append("🎓 **Swepub:** Otillgänglig ❌")
+    # Databaserna är oberoende - fråga alla parallellt (delar HTTP/2-anslutning per värd)
+    outcomes = await asyncio.gather(
+        *(fetch() for _, _, fetch in QUICK_STATS_SOURCES),
+        return_exceptions=True
+    )
 
-    # Test id.kb.se
-    try:
-        params = {"q": "*", "_limit": 1}
-        response = await api_client.get(f"{URLS['idkb']}/find", params=params, accept="application/ld+json")
-        data = response.json()
-        total = data.get("totalItems", 0)
-        lines.append(f"📖 **id.kb.se:** {total:,} auktoriteter ✅")
-    except Exception:
-        lines.append("📖 **id.kb.se:** Otillgänglig ❌")
+    for (label, unit, _), outcome in zip(QUICK_STATS_SOURCES, outcomes):
+        if isinstance(outcome, BaseException):
+            lines.append(f"{label} Otillgänglig ❌")
+        else:
+            lines.append(f"{label} {outcome:,} {unit} ✅")
 
     lines.append("\n---")
     lines.append("*Statistik hämtad i realtid från KB:s servrar*")
@@ -3165,10 +3616,40 @@ async def quick_stats() -> str:
     return "\n".join(lines)
 
 
+async def _related_by_subject(subject: str, original_title: str) -> List[str]:
+    """Rader för find_related_works: verk med samma ämne."""
+    params = {"query": f"ämne:{subject}", "n": 10, "format": "json"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    data = parse_json(response)
+    subject_items = data.get("xsearch", {}).get("list", [])
+
+    lines = [f"### Samma ämne ({subject})"]
+    for item in subject_items[:5]:
+        if item.get("title") != original_title:
+            lines.append(f"- **{item.get('title')}** - {item.get('creator', 'Okänd')} ({item.get('date', '')})")
+    lines.append("")
+    return lines
+
+
+async def _related_by_author(creator: str, original_title: str) -> List[str]:
+    """Rader för find_related_works: verk av samma författare."""
+    params = {"query": f"författare:{creator}", "n": 10, "format": "json"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    data = parse_json(response)
+    author_items = data.get("xsearch", {}).get("list", [])
+
+    lines = [f"### Samma författare ({creator})"]
+    for item in author_items[:5]:
+        if item.get("title") != original_title:
+            lines.append(f"- **{item.get('title')}** ({item.get('date', '')})")
+    lines.append("")
+    return lines
+
+
 @mcp.tool()
 async def find_related_works(
-    title: str = Field(description="Titel på verket att hitta relaterade verk till"),
-    relation_type: str = Field(default="subject", description="Typ av relation: 'subject' (samma ämne), 'author' (samma författare), 'both'")
+    title: Annotated[str, Field(description="Titel på verket att hitta relaterade verk till")],
+    relation_type: Annotated[str, Field(description="Typ av relation: 'subject' (samma ämne), 'author' (samma författare), 'both'")] = "subject"
 ) -> str:
     """
     Hitta verk som är relaterade till ett givet verk baserat på ämne eller författare.
@@ -3178,7 +3659,7 @@ async def find_related_works(
         # Först hitta originalverket
         params = {"query": f"titel:{title}", "n": 1, "format": "json", "format_extended": "true"}
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
+        data = parse_json(response)
         items = data.get("xsearch", {}).get("list", [])
 
         if not items:
@@ -3195,34 +3676,16 @@ async def find_related_works(
             ""
         ]
 
-        related_items = []
-
-        # Sök på ämne
+        # Ämnes- och författarsökningen är oberoende - kör dem parallellt
+        searches = []
         if relation_type in ["subject", "both"] and original_subject:
             first_subject = original_subject[0] if isinstance(original_subject, list) else original_subject
-            params = {"query": f"ämne:{first_subject}", "n": 10, "format": "json", "format_extended": "true"}
-            response = await api_client.get(URLS["libris_xsearch"], params=params)
-            data = response.json()
-            subject_items = data.get("xsearch", {}).get("list", [])
-
-            lines.append(f"### Samma ämne ({first_subject})")
-            for item in subject_items[:5]:
-                if item.get("title") != original_title:
-                    lines.append(f"- **{item.get('title')}** - {item.get('creator', 'Okänd')} ({item.get('date', '')})")
-            lines.append("")
-
-        # Sök på författare
+            searches.append(_related_by_subject(first_subject, original_title))
         if relation_type in ["author", "both"] and original_creator:
-            params = {"query": f"författare:{original_creator}", "n": 10, "format": "json", "format_extended": "true"}
-            response = await api_client.get(URLS["libris_xsearch"], params=params)
-            data = response.json()
-            author_items = data.get("xsearch", {}).get("list", [])
+            searches.append(_related_by_author(original_creator, original_title))
 
-            lines.append(f"### Samma författare ({original_creator})")
-            for item in author_items[:5]:
-                if item.get("title") != original_title:
-                    lines.append(f"- **{item.get('title')}** ({item.get('date', '')})")
-            lines.append("")
+        for section in await asyncio.gather(*searches):
+            lines.extend(section)
 
         return "\n".join(lines)
 
@@ -3230,33 +3693,35 @@ async def find_related_works(
         return handle_api_error(e, "find_related_works")
 
 
+# Svenska historiska perioder: (från år, till år, namn)
+HISTORICAL_PERIODS = {
+    "vikingatid": (800, 1100, "Vikingatiden"),
+    "medeltid": (1100, 1520, "Medeltiden"),
+    "vasatid": (1520, 1611, "Vasatiden"),
+    "stormaktstid": (1611, 1721, "Stormaktstiden"),
+    "frihetstid": (1721, 1772, "Frihetstiden"),
+    "gustaviansk": (1772, 1809, "Gustavianska tiden"),
+    "1800-tal": (1800, 1899, "1800-talet"),
+    "1900-tal": (1900, 1999, "1900-talet")
+}
+
+
 @mcp.tool()
 async def historical_periods_search(
-    period: str = Field(description="Historisk period: 'vikingatid', 'medeltid', 'vasatid', 'stormaktstid', 'frihetstid', 'gustaviansk', '1800-tal', '1900-tal'"),
-    item_type: str = Field(default="", description="Objekttyp att filtrera på (valfritt)"),
-    limit: int = Field(default=20, ge=1, le=100, description="Max antal resultat")
+    period: Annotated[str, Field(description="Historisk period: 'vikingatid', 'medeltid', 'vasatid', 'stormaktstid', 'frihetstid', 'gustaviansk', '1800-tal', '1900-tal'")],
+    item_type: Annotated[str, Field(description="Objekttyp att filtrera på (valfritt)")] = "",
+    limit: Annotated[int, Field(ge=1, le=100, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök kulturarvsobjekt från specifika historiska perioder i svensk historia.
     Använder fördefinierade årtal för varje period.
     """
-    periods = {
-        "vikingatid": (800, 1100, "Vikingatiden"),
-        "medeltid": (1100, 1520, "Medeltiden"),
-        "vasatid": (1520, 1611, "Vasatiden"),
-        "stormaktstid": (1611, 1721, "Stormaktstiden"),
-        "frihetstid": (1721, 1772, "Frihetstiden"),
-        "gustaviansk": (1772, 1809, "Gustavianska tiden"),
-        "1800-tal": (1800, 1899, "1800-talet"),
-        "1900-tal": (1900, 1999, "1900-talet")
-    }
-
     period_lower = period.lower()
-    if period_lower not in periods:
-        available = ", ".join(periods.keys())
+    if period_lower not in HISTORICAL_PERIODS:
+        available = ", ".join(HISTORICAL_PERIODS.keys())
         return f"Okänd period: '{period}'. Tillgängliga: {available}"
 
-    from_year, to_year, period_name = periods[period_lower]
+    from_year, to_year, period_name = HISTORICAL_PERIODS[period_lower]
 
     try:
         query = f"fromTime>={from_year} AND toTime<={to_year}"
@@ -3270,20 +3735,19 @@ async def historical_periods_search(
             "startRecord": 1
         }
 
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
+        response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+        data = parse_ksamsok_xml(response.content)
 
         total = data.get("total_hits", 0)
         records = data.get("records", [])
 
         lines = [
             f"## {period_name} ({from_year}-{to_year})",
-            f"**Totalt:** {total:,} objekt",
-            ""
+            f"**Totalt:** {total:,} objekt"
         ]
-
         if item_type:
-            lines.insert(2, f"**Objekttyp:** {item_type}")
+            lines.append(f"**Objekttyp:** {item_type}")
+        lines.append("")
 
         for i, record in enumerate(records, 1):
             label = record.get("label", "Utan benämning")
@@ -3329,7 +3793,7 @@ async def kb_api_info() -> str:
 - **oaipmh_get_record/resume**: Enskilda poster och paginering
 
 ### 🎞️ Digitalt (data.kb.se)
-- **kb_data_list_collections/get_item/search**: Digitaliserat material
+- **kb_data_list_collections/get_item/get_items/search**: Digitaliserat material
 - **kb_data_get_manifest/metadata**: IIIF och metadata
 
 ### 🎓 Forskning (Swepub)
@@ -3358,7 +3822,7 @@ async def kb_api_info() -> str:
 - **kb_server_config**: Visa konfiguration
 
 ---
-**Totalt:** 65 verktyg | 11 resurser | 11 prompts
+**Totalt:** 66 verktyg | 11 resurser | 11 prompts
 **Data:** 20M+ bibliografiska poster, 10M+ kulturarvsobjekt
 **Nya funktioner:** Automatisk retry, cache, miljövariabler
 """
@@ -3366,7 +3830,7 @@ async def kb_api_info() -> str:
 
 @mcp.tool()
 async def kb_api_status(
-    api_name: str = Field(default="all", description="API att kontrollera: 'libris', 'ksamsok', 'idkb', 'all'")
+    api_name: Annotated[str, Field(description="API att kontrollera: 'libris', 'ksamsok', 'idkb', 'all'")] = "all"
 ) -> str:
     """
     Kontrollera status för KB:s API:er.
@@ -3386,26 +3850,28 @@ async def kb_api_status(
         else:
             return f"Okänt API: {api_name}. Välj bland: libris, ksamsok, idkb, all"
     
-    for name, (url, params) in apis_to_check.items():
-        try:
-            await api_client.get(url, params=params, accept="application/json")
+    # Kontrollera alla API:er parallellt. Kort cachetid så att upprepade
+    # kontroller återanvänder svaret men status ändå hålls aktuell.
+    outcomes = await asyncio.gather(
+        *(
+            api_client.get(url, params=params, accept=ACCEPT_JSON, cache_ttl=Config.STATUS_CACHE_TTL)
+            for url, params in apis_to_check.values()
+        ),
+        return_exceptions=True
+    )
+    
+    for name, outcome in zip(apis_to_check, outcomes):
+        if isinstance(outcome, BaseException):
+            statuses.append(f"❌ **{name}**: Otillgänglig ({type(outcome).__name__})")
+        else:
             statuses.append(f"✅ **{name}**: Tillgänglig")
-        except Exception as e:
-            statuses.append(f"❌ **{name}**: Otillgänglig ({type(e).__name__})")
     
     return "## API Status\n\n" + "\n".join(statuses)
 
 
-@mcp.tool()
-async def kb_search_tips(
-    api_name: str = Field(default="libris", description="API: 'libris', 'ksamsok', 'sparql'")
-) -> str:
-    """
-    Visa söktips och syntax för ett specifikt API.
-    Hjälper till att formulera effektiva sökfrågor.
-    """
-    tips = {
-        "libris": """## Libris Söktips
+# Söktips per API för kb_search_tips
+KB_SEARCH_TIPS = {
+    "libris": """## Libris Söktips
 
 ### Fältsökning
 - `titel:Röda rummet` - Sök i titel
@@ -3426,7 +3892,7 @@ async def kb_search_tips(
 - `författare:Lindgren AND titel:Pippi`
 - `ämne:"svensk historia" NOT krig`
 """,
-        "ksamsok": """## K-samsök Söktips (CQL)
+    "ksamsok": """## K-samsök Söktips (CQL)
 
 ### Enkel sökning
 - `text=runsten` - Fritext
@@ -3453,7 +3919,7 @@ async def kb_search_tips(
 - `text=vikingasvärd AND countyName="Gotlands län"`
 - `itemType=Building AND fromTime>=1600 AND toTime<=1700`
 """,
-        "sparql": """## SPARQL Tips
+    "sparql": """## SPARQL Tips
 
 ### Grundläggande
 ```sparql
@@ -3486,21 +3952,23 @@ ORDER BY DESC(?count)
 - Använd LIMIT för att testa
 - Utnyttja sparql_templates för exempel
 """
-    }
-    
-    return tips.get(api_name, f"Söktips finns för: libris, ksamsok, sparql")
+}
 
 
 @mcp.tool()
-async def kb_data_dictionary(
-    entity_type: str = Field(default="book", description="Entitetstyp: 'book', 'person', 'subject', 'cultural_object'")
+async def kb_search_tips(
+    api_name: Annotated[str, Field(description="API: 'libris', 'ksamsok', 'sparql'")] = "libris"
 ) -> str:
     """
-    Visa datadefinitioner och fältbeskrivningar.
-    Hjälper att förstå metadata-strukturen.
+    Visa söktips och syntax för ett specifikt API.
+    Hjälper till att formulera effektiva sökfrågor.
     """
-    dicts = {
-        "book": """## Datadefinition: Bok (Libris)
+    return KB_SEARCH_TIPS.get(api_name, f"Söktips finns för: libris, ksamsok, sparql")
+
+
+# Datadefinitioner per entitetstyp för kb_data_dictionary
+KB_DATA_DICTIONARIES = {
+    "book": """## Datadefinition: Bok (Libris)
 
 | Fält | Beskrivning | Exempel |
 |------|-------------|---------|
@@ -3513,7 +3981,7 @@ async def kb_data_dictionary(
 | subject | Ämnesord | ["Svensk litteratur"] |
 | language | Språk | "swe" |
 """,
-        "person": """## Datadefinition: Person (Auktoritet)
+    "person": """## Datadefinition: Person (Auktoritet)
 
 | Fält | Beskrivning | Exempel |
 |------|-------------|---------|
@@ -3524,7 +3992,7 @@ async def kb_data_dictionary(
 | occupation | Yrke | "Författare" |
 | sameAs | Andra ID | ["VIAF:123", "Wikidata:Q123"] |
 """,
-        "subject": """## Datadefinition: Ämnesord (SAO)
+    "subject": """## Datadefinition: Ämnesord (SAO)
 
 | Fält | Beskrivning | Exempel |
 |------|-------------|---------|
@@ -3535,7 +4003,7 @@ async def kb_data_dictionary(
 | related | Relaterade termer | ["Växthusgaser"] |
 | scopeNote | Definition | "Avser..." |
 """,
-        "cultural_object": """## Datadefinition: Kulturarvsobjekt (K-samsök)
+    "cultural_object": """## Datadefinition: Kulturarvsobjekt (K-samsök)
 
 | Fält | Beskrivning | Exempel |
 |------|-------------|---------|
@@ -3548,22 +4016,23 @@ async def kb_data_dictionary(
 | geoDataExists | Har koordinater | true/false |
 | serviceName | Institution | "Riksantikvarieämbetet" |
 """
-    }
-    
-    return dicts.get(entity_type, f"Datadefinitioner finns för: book, person, subject, cultural_object")
+}
 
 
 @mcp.tool()
-async def kb_example_queries(
-    api_name: str = Field(description="API: 'libris', 'ksamsok', 'swepub', 'sparql'"),
-    use_case: str = Field(default="general", description="Användningsfall: 'general', 'genealogy', 'research', 'culture'")
+async def kb_data_dictionary(
+    entity_type: Annotated[str, Field(description="Entitetstyp: 'book', 'person', 'subject', 'cultural_object'")] = "book"
 ) -> str:
     """
-    Visa exempelfrågor för vanliga användningsfall.
-    Inspiration och startpunkt för egna sökningar.
+    Visa datadefinitioner och fältbeskrivningar.
+    Hjälper att förstå metadata-strukturen.
     """
-    examples = {
-        ("libris", "general"): """## Libris Exempel
+    return KB_DATA_DICTIONARIES.get(entity_type, f"Datadefinitioner finns för: book, person, subject, cultural_object")
+
+
+# Exempelfrågor per (API, användningsfall) för kb_example_queries
+KB_EXAMPLE_QUERIES = {
+    ("libris", "general"): """## Libris Exempel
 
 **Hitta alla böcker av en författare:**
 ```
@@ -3580,7 +4049,7 @@ libris_search_subject(subject="vikingatiden")
 libris_find(query="titel:Stockholm AND år:[1900 TO 1950]")
 ```
 """,
-        ("ksamsok", "genealogy"): """## K-samsök för Släktforskning
+    ("ksamsok", "genealogy"): """## K-samsök för Släktforskning
 
 **Fotografier från en socken:**
 ```
@@ -3597,7 +4066,7 @@ ksamsok_search(query='itemType=Map AND municipalityName="Uppsala"')
 ksamsok_search(query='text=gravsten AND thumbnailExists=true')
 ```
 """,
-        ("swepub", "research"): """## Swepub för Forskning
+    ("swepub", "research"): """## Swepub för Forskning
 
 **Hitta publikationer inom ett fält:**
 ```
@@ -3614,7 +4083,7 @@ swepub_search_author(author_name="Andersson, Anna")
 swepub_export(query="ämne:AI", format="ris")
 ```
 """,
-        ("sparql", "general"): """## SPARQL Exempel
+    ("sparql", "general"): """## SPARQL Exempel
 
 **Räkna böcker per år:**
 ```
@@ -3633,16 +4102,26 @@ GROUP BY ?year ORDER BY ?year
 sparql_templates(category="authors")
 ```
 """
-    }
-    
+}
+
+
+@mcp.tool()
+async def kb_example_queries(
+    api_name: Annotated[str, Field(description="API: 'libris', 'ksamsok', 'swepub', 'sparql'")],
+    use_case: Annotated[str, Field(description="Användningsfall: 'general', 'genealogy', 'research', 'culture'")] = "general"
+) -> str:
+    """
+    Visa exempelfrågor för vanliga användningsfall.
+    Inspiration och startpunkt för egna sökningar.
+    """
     key = (api_name, use_case)
-    if key in examples:
-        return examples[key]
+    if key in KB_EXAMPLE_QUERIES:
+        return KB_EXAMPLE_QUERIES[key]
     
     # Fallback
     general_key = (api_name, "general")
-    if general_key in examples:
-        return examples[general_key]
+    if general_key in KB_EXAMPLE_QUERIES:
+        return KB_EXAMPLE_QUERIES[general_key]
     
     return f"Exempel finns för kombinationer av api_name (libris, ksamsok, swepub, sparql) och use_case (general, genealogy, research, culture)"
 
@@ -3667,6 +4146,13 @@ async def kb_server_config() -> str:
         f"- HTTP timeout: {config['http_timeout']}s",
         f"- Connect timeout: {config['connect_timeout']}s",
         "",
+        "### Anslutningar",
+        f"- Max connections: {config['max_connections']}",
+        f"- Max keep-alive: {config['max_keepalive_connections']}",
+        f"- Max samtidiga anrop: {config['max_concurrent_requests']}",
+        f"- Keep-alive expiry: {config['keepalive_expiry']}s",
+        f"- HTTP/2: {config['http2']}",
+        "",
         "### Retry",
         f"- Max retries: {config['max_retries']}",
         f"- Base delay: {config['retry_base_delay']}s",
@@ -3676,6 +4162,7 @@ async def kb_server_config() -> str:
         f"- Enabled: {config['cache_enabled']}",
         f"- TTL: {config['cache_ttl']}s",
         f"- Max size: {config['cache_max_size']}",
+        f"- Max bytes per post: {config['cache_max_bytes']}",
         "",
         "### Cache-statistik",
         f"- Storlek: {cache_stats['size']}/{cache_stats['max_size']}",
@@ -3731,6 +4218,7 @@ async def kb_cache_stats() -> str:
 | Cache hits | {stats['hits']} |
 | Cache misses | {stats['misses']} |
 | Hit rate | {stats['hit_rate']} |
+| Ej cachade (för stora) | {stats['skipped_too_large']} |
 
 ### Förklaring
 - **Hit rate** visar hur ofta cachen kunde leverera data utan API-anrop
@@ -3743,11 +4231,68 @@ kb_cache_clear()
 ```"""
 
 
+async def _batch_libris(term: str, limit: int) -> List[str]:
+    """Libris-delen av batch_search för en sökterm."""
+    params = {"query": term, "n": limit, "format": "json"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    data = parse_json(response)
+    items = data.get("xsearch", {}).get("list", [])
+    total = data.get("xsearch", {}).get("records", 0)
+
+    lines = [f"*{total} träffar totalt*\n"]
+    for item in items:
+        title = item.get("title", "Utan titel")
+        creator = item.get("creator", "Okänd")
+        date = item.get("date", "")
+        lines.append(f"- **{title}** - {creator} ({date})")
+    return lines
+
+
+async def _batch_ksamsok(term: str, limit: int) -> List[str]:
+    """K-samsök-delen av batch_search för en sökterm."""
+    params = {"method": "search", "query": f"text={term}", "hitsPerPage": limit}
+    response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+    data = parse_ksamsok_xml(response.content)
+    records = data.get("records", [])
+    total = data.get("total_hits", 0)
+
+    lines = [f"*{total} objekt totalt*\n"]
+    for record in records:
+        label = record.get("label", "Utan benämning")
+        obj_type = record.get("type", "")
+        lines.append(f"- **{label}** ({obj_type})")
+    return lines
+
+
+async def _batch_swepub(term: str, limit: int) -> List[str]:
+    """Swepub-delen av batch_search för en sökterm."""
+    params = {"query": term, "database": "swepub", "n": limit, "format": "json"}
+    response = await api_client.get(URLS["swepub"], params=params)
+    data = parse_json(response)
+    items = data.get("xsearch", {}).get("list", [])
+    total = data.get("xsearch", {}).get("records", 0)
+
+    lines = [f"*{total} publikationer totalt*\n"]
+    for item in items:
+        title = item.get("title", "Utan titel")
+        creator = item.get("creator", "Okänd")
+        lines.append(f"- **{title}** - {creator}")
+    return lines
+
+
+# Hämtningsfunktion per källa i batch_search
+BATCH_SOURCES = {
+    "libris": _batch_libris,
+    "ksamsok": _batch_ksamsok,
+    "swepub": _batch_swepub,
+}
+
+
 @mcp.tool()
 async def batch_search(
-    queries: str = Field(description="Kommaseparerade söktermer, t.ex. 'Strindberg, Lagerlöf, Lindgren'"),
-    source: str = Field(default="libris", description="Källa: 'libris', 'ksamsok', 'swepub'"),
-    limit_per_query: int = Field(default=5, ge=1, le=20, description="Max resultat per sökterm")
+    queries: Annotated[str, Field(description="Kommaseparerade söktermer, t.ex. 'Strindberg, Lagerlöf, Lindgren'")],
+    source: Annotated[str, Field(description="Källa: 'libris', 'ksamsok', 'swepub'")] = "libris",
+    limit_per_query: Annotated[int, Field(ge=1, le=20, description="Max resultat per sökterm")] = 5
 ) -> str:
     """
     Sök efter flera termer i en enda operation.
@@ -3763,56 +4308,23 @@ async def batch_search(
 
     results = [f"## Batch-sökning i {source.upper()}", f"**Söktermer:** {len(terms)}", ""]
 
-    for term in terms:
-        results.append(f"### {term}")
-
-        try:
-            if source == "libris":
-                params = {"query": term, "n": limit_per_query, "format": "json", "format_extended": "true"}
-                response = await api_client.get(URLS["libris_xsearch"], params=params)
-                data = response.json()
-                items = data.get("xsearch", {}).get("list", [])
-                total = data.get("xsearch", {}).get("records", 0)
-
-                results.append(f"*{total} träffar totalt*\n")
-                for item in items:
-                    title = item.get("title", "Utan titel")
-                    creator = item.get("creator", "Okänd")
-                    date = item.get("date", "")
-                    results.append(f"- **{title}** - {creator} ({date})")
-
-            elif source == "ksamsok":
-                params = {"method": "search", "query": f"text={term}", "hitsPerPage": limit_per_query}
-                response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-                data = parse_ksamsok_xml(response.text)
-                records = data.get("records", [])
-                total = data.get("total_hits", 0)
-
-                results.append(f"*{total} objekt totalt*\n")
-                for record in records:
-                    label = record.get("label", "Utan benämning")
-                    obj_type = record.get("type", "")
-                    results.append(f"- **{label}** ({obj_type})")
-
-            elif source == "swepub":
-                params = {"query": term, "database": "swepub", "n": limit_per_query, "format": "json"}
-                response = await api_client.get(URLS["swepub"], params=params)
-                data = response.json()
-                items = data.get("xsearch", {}).get("list", [])
-                total = data.get("xsearch", {}).get("records", 0)
-
-                results.append(f"*{total} publikationer totalt*\n")
-                for item in items:
-                    title = item.get("title", "Utan titel")
-                    creator = item.get("creator", "Okänd")
-                    results.append(f"- **{title}** - {creator}")
-
-            else:
-                results.append(f"Okänd källa: {source}")
+    fetch = BATCH_SOURCES.get(source)
 
-        except Exception as e:
-            results.append(f"Fel: {str(e)}")
+    # Söktermerna är oberoende - kör alla parallellt (svarstid ≈ långsammaste termen)
+    if fetch is not None:
+        outcomes = await asyncio.gather(
+            *(fetch(term, limit_per_query) for term in terms),
+            return_exceptions=True
+        )
+    else:
+        outcomes = [[f"Okänd källa: {source}"]] * len(terms)
 
+    for term, outcome in zip(terms, outcomes):
+        results.append(f"### {term}")
+        if isinstance(outcome, BaseException):
+            results.append(f"Fel: {str(outcome)}")
+        else:
+            results.extend(outcome)
         results.append("")
 
     return "\n".join(results)
@@ -3820,8 +4332,8 @@ async def batch_search(
 
 @mcp.tool()
 async def generate_citation(
-    record_id: str = Field(description="Libris post-ID för att generera citat"),
-    style: str = Field(default="apa", description="Citationsstil: 'apa', 'mla', 'chicago', 'harvard'")
+    record_id: Annotated[str, Field(description="Libris post-ID för att generera citat")],
+    style: Annotated[str, Field(description="Citationsstil: 'apa', 'mla', 'chicago', 'harvard'")] = "apa"
 ) -> str:
     """
     Generera akademiskt korrekt citat för en Libris-post.
@@ -3833,8 +4345,8 @@ async def generate_citation(
             record_id = f"/{record_id}"
 
         url = f"{URLS['libris_xl']}{record_id}"
-        response = await api_client.get(url, accept="application/ld+json")
-        data = response.json()
+        response = await api_client.get(url, accept=ACCEPT_JSONLD)
+        data = parse_json(response)
 
         main = data.get("mainEntity", data.get("@graph", [{}])[0] if "@graph" in data else data)
 
@@ -3907,11 +4419,43 @@ async def generate_citation(
         return handle_api_error(e, "generate_citation")
 
 
+async def _compare_libris(term: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """Antal träffar och topposter i Libris för compare_terms."""
+    params = {"query": term, "n": 5, "format": "json", "format_extended": "true"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    data = parse_json(response)
+    return data.get("xsearch", {}).get("records", 0), data.get("xsearch", {}).get("list", [])
+
+
+async def _compare_ksamsok(term: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """Antal träffar och topposter i K-samsök för compare_terms."""
+    params = {"method": "search", "query": f"text={term}", "hitsPerPage": 5}
+    response = await api_client.get(URLS["ksamsok"], params=params, accept=ACCEPT_XML)
+    data = parse_ksamsok_xml(response.content)
+    return data.get("total_hits", 0), data.get("records", [])
+
+
+async def _compare_swepub(term: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """Antal träffar och topposter i Swepub för compare_terms."""
+    params = {"query": term, "database": "swepub", "n": 5, "format": "json"}
+    response = await api_client.get(URLS["swepub"], params=params)
+    data = parse_json(response)
+    return data.get("xsearch", {}).get("records", 0), data.get("xsearch", {}).get("list", [])
+
+
+# Hämtningsfunktion per källa i compare_terms
+COMPARE_SOURCES = {
+    "libris": _compare_libris,
+    "ksamsok": _compare_ksamsok,
+    "swepub": _compare_swepub,
+}
+
+
 @mcp.tool()
 async def compare_terms(
-    term1: str = Field(description="Första söktermen"),
-    term2: str = Field(description="Andra söktermen"),
-    source: str = Field(default="libris", description="Källa: 'libris', 'ksamsok', 'swepub'")
+    term1: Annotated[str, Field(description="Första söktermen")],
+    term2: Annotated[str, Field(description="Andra söktermen")],
+    source: Annotated[str, Field(description="Källa: 'libris', 'ksamsok', 'swepub'")] = "libris"
 ) -> str:
     """
     Jämför två söktermer och visa skillnader i antal träffar och resultat.
@@ -3923,29 +4467,15 @@ async def compare_terms(
     term2_data = {"total": 0, "items": []}
 
     try:
-        if source == "libris":
-            for term, data_store in [(term1, term1_data), (term2, term2_data)]:
-                params = {"query": term, "n": 5, "format": "json", "format_extended": "true"}
-                response = await api_client.get(URLS["libris_xsearch"], params=params)
-                data = response.json()
-                data_store["total"] = data.get("xsearch", {}).get("records", 0)
-                data_store["items"] = data.get("xsearch", {}).get("list", [])
-
-        elif source == "ksamsok":
-            for term, data_store in [(term1, term1_data), (term2, term2_data)]:
-                params = {"method": "search", "query": f"text={term}", "hitsPerPage": 5}
-                response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-                data = parse_ksamsok_xml(response.text)
-                data_store["total"] = data.get("total_hits", 0)
-                data_store["items"] = data.get("records", [])
-
-        elif source == "swepub":
-            for term, data_store in [(term1, term1_data), (term2, term2_data)]:
-                params = {"query": term, "database": "swepub", "n": 5, "format": "json"}
-                response = await api_client.get(URLS["swepub"], params=params)
-                data = response.json()
-                data_store["total"] = data.get("xsearch", {}).get("records", 0)
-                data_store["items"] = data.get("xsearch", {}).get("list", [])
+        fetch = COMPARE_SOURCES.get(source)
+        if fetch is not None:
+            # Termerna är oberoende - hämta båda parallellt
+            for data_store, (total, items) in zip(
+                (term1_data, term2_data),
+                await asyncio.gather(fetch(term1), fetch(term2))
+            ):
+                data_store["total"] = total
+                data_store["items"] = items
 
     except Exception as e:
         return handle_api_error(e, "compare_terms")
@@ -3990,10 +4520,10 @@ async def compare_terms(
 
 @mcp.tool()
 async def year_range_search(
-    from_year: int = Field(description="Startår"),
-    to_year: int = Field(description="Slutår"),
-    query: str = Field(default="", description="Valfri sökterm att kombinera med"),
-    limit: int = Field(default=20, ge=1, le=100, description="Max antal resultat")
+    from_year: Annotated[int, Field(description="Startår")],
+    to_year: Annotated[int, Field(description="Slutår")],
+    query: Annotated[str, Field(description="Valfri sökterm att kombinera med")] = "",
+    limit: Annotated[int, Field(ge=1, le=100, description="Max antal resultat")] = 20
 ) -> str:
     """
     Sök böcker utgivna under ett specifikt årtalsintervall i Libris.
@@ -4012,7 +4542,7 @@ async def year_range_search(
         }
 
         response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
+        data = parse_json(response)
         xsearch = data.get("xsearch", {})
         total = xsearch.get("records", 0)
         items = xsearch.get("list", [])
@@ -4043,15 +4573,40 @@ async def year_range_search(
 # SERVER RUNNERS
 # ============================================================================
 
+def install_fast_event_loop() -> Optional[str]:
+    """
+    Installerar uvloop (winloop på Windows) som event loop om det finns.
+
+    Returns:
+        Namnet på installerad loop, eller None om standardloopen används
+    """
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return None
+
+    asyncio.set_event_loop_policy(fast_loop.EventLoopPolicy())
+    return fast_loop.__name__
+
+
 def run_stdio():
     """Kör servern med stdio-transport (för Claude Desktop, Claude Code)."""
     mcp.run(transport="stdio")
 
 
+# Svar mindre än så här komprimeras inte (gzip-overhead lönar sig inte)
+GZIP_MINIMUM_SIZE = 1024
+
+
 def run_http(host: str = "0.0.0.0", port: int = 8000):
     """Kör servern med HTTP-transport (för remote access, Render deployment)."""
     import uvicorn
     from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.middleware.gzip import GZipMiddleware
     from starlette.routing import Route, Mount
     from starlette.responses import JSONResponse
     
@@ -4063,7 +4618,7 @@ def run_http(host: str = "0.0.0.0", port: int = 8000):
             "name": "kb-api",
             "version": "2.2.0",
             "description": "Kungliga bibliotekets öppna API:er via MCP",
-            "tools": 65,
+            "tools": 66,
             "resources": 11,
             "prompts": 11,
             "features": [
@@ -4079,13 +4634,17 @@ def run_http(host: str = "0.0.0.0", port: int = 8000):
     # Hämta FastMCP:s SSE-app
     sse_app = mcp.sse_app()
     
-    # Skapa Starlette-app med egna routes och mount SSE
+    # Skapa Starlette-app med egna routes och mount SSE.
+    # GZip hoppar själv över text/event-stream så SSE-strömmen påverkas inte.
     app = Starlette(
         debug=False,
         routes=[
             Route("/health", health),
             Route("/info", info),
             Mount("/", app=sse_app),
+        ],
+        middleware=[
+            Middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=6),
         ]
     )
     
@@ -4108,6 +4667,10 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
+    loop_name = install_fast_event_loop()
+    if loop_name:
+        logger.info(f"Event loop: {loop_name}")
+    
     if args.http:
         run_http(args.host, args.port)
     else:
@@ -4,32 +4,80 @@ Gemensamma HTTP-klienter och hjälpfunktioner för KB:s API:er.
 
 Version: 2.2.0
 - Retry-logik med exponentiell backoff
-- Enkel in-memory cache
+- Enkel in-memory cache (LRU + TTL)
 - Förbättrad felhantering
 - Miljövariabel-konfiguration
 """
 
 import asyncio
+import importlib.util
+import io
 import json
 import logging
 import os
+import random
+import re
+import socket
 import time
+import unicodedata
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Optional, Dict, List, Tuple
-from urllib.parse import urlencode, quote_plus
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterator, Optional, Dict, List, Tuple, Union
+from urllib.parse import urlsplit
 from functools import wraps
 
 import httpx
 
-# Konfigurera logging till stderr (viktigt för stdio-transport)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+# HTTP/2 kräver h2-paketet (httpx[http2]) - faller tillbaka till HTTP/1.1 annars
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Snabbare JSON-parsning om orjson finns - faller tillbaka till json annars
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# C-accelererad XML-parsning om lxml finns - faller tillbaka till ElementTree annars
+try:
+    from lxml import etree as lxml_etree
+    LXML_AVAILABLE = True
+except ImportError:
+    lxml_etree = None
+    LXML_AVAILABLE = False
+
+# Lokal konvertering från JSON-LD till Turtle/RDF-XML om rdflib finns.
+# rdflib är tungt att importera - här kollas bara att det finns, importen
+# sker först vid första konverteringen.
+RDFLIB_AVAILABLE = importlib.util.find_spec("rdflib") is not None
+
 logger = logging.getLogger("kb_mcp")
 
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Konfigurerar logging till stderr (viktigt för stdio-transport).
+
+    Anropas från serverns startpunkt i stället för vid import, och lämnar
+    root-loggern orörd om värdprocessen redan har konfigurerat den.
+    """
+    if logging.getLogger().handlers:
+        return
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
 # ============================================================================
 # KONFIGURATION VIA MILJÖVARIABLER
 # ============================================================================
@@ -41,6 +89,14 @@ class Config:
     HTTP_TIMEOUT: float = float(os.environ.get("KB_HTTP_TIMEOUT", "30.0"))
     CONNECT_TIMEOUT: float = float(os.environ.get("KB_CONNECT_TIMEOUT", "10.0"))
 
+    # Connection pool
+    MAX_CONNECTIONS: int = int(os.environ.get("KB_MAX_CONNECTIONS", "100"))
+    MAX_KEEPALIVE_CONNECTIONS: int = int(os.environ.get("KB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    MAX_CONCURRENT_REQUESTS: int = int(os.environ.get("KB_MAX_CONCURRENT_REQUESTS", "20"))
+    KEEPALIVE_EXPIRY: float = float(os.environ.get("KB_KEEPALIVE_EXPIRY", "60.0"))
+    HTTP2_ENABLED: bool = os.environ.get("KB_HTTP2_ENABLED", "true").lower() == "true"
+    DNS_PREWARM: bool = os.environ.get("KB_DNS_PREWARM", "true").lower() == "true"
+
     # Retry
     MAX_RETRIES: int = int(os.environ.get("KB_MAX_RETRIES", "3"))
     RETRY_BASE_DELAY: float = float(os.environ.get("KB_RETRY_BASE_DELAY", "1.0"))
@@ -50,6 +106,27 @@ class Config:
     CACHE_ENABLED: bool = os.environ.get("KB_CACHE_ENABLED", "true").lower() == "true"
     CACHE_TTL: int = int(os.environ.get("KB_CACHE_TTL", "300"))  # 5 minuter
     CACHE_MAX_SIZE: int = int(os.environ.get("KB_CACHE_MAX_SIZE", "1000"))
+    # Större svar (t.ex. stora OAI-PMH-sidor) cachas inte
+    CACHE_MAX_BYTES: int = int(os.environ.get("KB_CACHE_MAX_BYTES", str(512 * 1024)))
+    ISBN_CACHE_TTL: int = int(os.environ.get("KB_ISBN_CACHE_TTL", "86400"))  # 1 dygn
+    IDKB_CACHE_TTL: int = int(os.environ.get("KB_IDKB_CACHE_TTL", "604800"))  # 1 vecka
+    NEGATIVE_CACHE_TTL: int = int(os.environ.get("KB_NEGATIVE_CACHE_TTL", "300"))  # 404/410
+    STATUS_CACHE_TTL: int = int(os.environ.get("KB_STATUS_CACHE_TTL", "60"))  # kb_api_status
+
+    # Max storlek på POST-svar (SPARQL) innan nedladdningen avbryts
+    MAX_RESPONSE_BYTES: int = int(os.environ.get("KB_MAX_RESPONSE_BYTES", str(20 * 1024 * 1024)))
+    # LIMIT som läggs till i SELECT-frågor som saknar egen LIMIT
+    SPARQL_DEFAULT_LIMIT: int = int(os.environ.get("KB_SPARQL_DEFAULT_LIMIT", "10000"))
+
+    # Max antal samtidiga anrop i batch-verktyg (t.ex. kb_data_get_items)
+    BATCH_CONCURRENCY: int = int(os.environ.get("KB_BATCH_CONCURRENCY", "10"))
+
+    # Formatering (stora resultat formateras i trådpool för att inte blockera event loop)
+    FORMAT_WORKERS: int = int(os.environ.get("KB_FORMAT_WORKERS", "8"))
+    FORMAT_OFFLOAD_THRESHOLD: int = int(os.environ.get("KB_FORMAT_OFFLOAD_THRESHOLD", "50"))
+    # Konvertera cachad JSON-LD lokalt med rdflib i stället för att hämta
+    # Turtle/RDF-XML från servern (prefix och ordning skiljer sig från serverns)
+    LOCAL_RDF_CONVERSION: bool = os.environ.get("KB_LOCAL_RDF_CONVERSION", "false").lower() == "true"
 
     # Identifikation
     USER_AGENT: str = os.environ.get(
@@ -73,47 +150,110 @@ URLS = {
     "idkb": "https://id.kb.se",
 }
 
+# Accept-headers (mediatyper) som används mot API:erna
+ACCEPT_JSON = "application/json"
+ACCEPT_JSONLD = "application/ld+json"
+ACCEPT_SPARQL_JSON = "application/sparql-results+json"
+ACCEPT_XML = "application/xml"
+ACCEPT_RDFXML = "application/rdf+xml"
+ACCEPT_TURTLE = "text/turtle"
+
 # För bakåtkompatibilitet
 HTTP_TIMEOUT = Config.HTTP_TIMEOUT
 USER_AGENT = Config.USER_AGENT
 
 
+# ============================================================================
+# SÖKFRÅGOR
+# ============================================================================
+
+# Libris-fält vars prefix normaliseras (gemener, inga mellanslag runt kolon)
+QUERY_FIELDS = (
+    "titel", "författare", "ämne", "isbn", "issn", "år", "förlag",
+    "orcid", "organisation", "id",
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_FIELD_PREFIX_RE = re.compile(
+    r"(?<!\w)(" + "|".join(QUERY_FIELDS) + r")\s*:\s*",
+    re.IGNORECASE
+)
+
+
+def canonicalize_query(query: str) -> str:
+    """
+    Normaliserar en sökfråga så att likvärdiga frågor får samma cache-nyckel.
+
+    Unicode normaliseras till NFC, blanksteg slås ihop och kända fältprefix
+    skrivs med gemener utan mellanslag runt kolon, t.ex.
+    'Författare:  Strindberg' -> 'författare:Strindberg'. Fritext och
+    operatorer lämnas orörda så att frågans betydelse inte ändras.
+
+    Args:
+        query: Sökfråga från användaren
+
+    Returns:
+        Normaliserad sökfråga
+    """
+    query = unicodedata.normalize("NFC", query)
+    query = _WHITESPACE_RE.sub(" ", query).strip()
+    return _FIELD_PREFIX_RE.sub(lambda m: f"{m.group(1).lower()}:", query)
+
+
 # ============================================================================
 # CACHE IMPLEMENTATION
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class CacheEntry:
-    """En cache-post med data och tidsstämpel."""
+    """En cache-post med data och tidsstämpel (slots: ingen __dict__ per post)."""
     data: Any
     timestamp: float
     hits: int = 0
+    ttl: Optional[int] = None  # None = cachens standard-TTL
 
 
 class SimpleCache:
-    """Enkel in-memory cache med TTL och LRU-liknande eviction."""
+    """Enkel in-memory cache med TTL och LRU-eviction."""
 
-    def __init__(self, ttl: int = 300, max_size: int = 1000):
-        self._cache: Dict[str, CacheEntry] = {}
+    def __init__(self, ttl: int = 300, max_size: int = 1000, max_bytes: int = 512 * 1024):
+        # Ordningen i OrderedDict är LRU-ordningen: äldst använd först
+        self._cache: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
         self._ttl = ttl
         self._max_size = max_size
+        self._max_bytes = max_bytes
         self._hits = 0
         self._misses = 0
+        self._skipped_size = 0
 
-    def _make_key(self, url: str, params: Optional[Dict] = None, accept: str = "") -> str:
-        """Skapa en unik nyckel för cache."""
-        parts = [url]
-        if params:
-            parts.append(json.dumps(params, sort_keys=True))
-        parts.append(accept)
-        return "|".join(parts)
-
-    def get(self, url: str, params: Optional[Dict] = None, accept: str = "") -> Optional[Any]:
+    def _make_key(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        accept: str = "",
+        method: str = "GET"
+    ) -> Tuple:
+        """Skapa en unik nyckel för cache (parametrarnas ordning spelar ingen roll)."""
+        if not params:
+            return (method, url, (), accept)
+        # Listvärden (upprepade parametrar) görs om till tupler så att nyckeln är hashbar
+        items = tuple(sorted(
+            (k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()
+        ))
+        return (method, url, items, accept)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        accept: str = "",
+        method: str = "GET"
+    ) -> Optional[Any]:
         """Hämta från cache om det finns och inte har gått ut."""
         if not Config.CACHE_ENABLED:
             return None
 
-        key = self._make_key(url, params, accept)
+        key = self._make_key(url, params, accept, method)
         entry = self._cache.get(key)
 
         if entry is None:
@@ -121,51 +261,58 @@ class SimpleCache:
             return None
 
         # Kontrollera TTL
-        if time.time() - entry.timestamp > self._ttl:
+        ttl = entry.ttl if entry.ttl is not None else self._ttl
+        if time.time() - entry.timestamp > ttl:
             del self._cache[key]
             self._misses += 1
             return None
 
+        self._cache.move_to_end(key)
         entry.hits += 1
         self._hits += 1
         return entry.data
 
-    def set(self, url: str, data: Any, params: Optional[Dict] = None, accept: str = "") -> None:
-        """Spara i cache."""
+    def set(
+        self,
+        url: str,
+        data: Any,
+        params: Optional[Dict] = None,
+        accept: str = "",
+        ttl: Optional[int] = None,
+        method: str = "GET",
+        size: int = 0
+    ) -> None:
+        """
+        Spara i cache, med egen TTL för posten om ttl anges.
+
+        Poster vars size (i byte) överstiger max_bytes sparas inte, så att
+        enstaka stora svar inte tränger undan många små.
+        """
         if not Config.CACHE_ENABLED:
             return
 
-        key = self._make_key(url, params, accept)
+        if size > self._max_bytes:
+            self._skipped_size += 1
+            return
+
+        key = self._make_key(url, params, accept, method)
 
-        # Rensa gamla poster om cachen är full
-        if len(self._cache) >= self._max_size:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self._max_size:
+            # Rensa minst nyligen använda poster om cachen är full
             self._evict()
 
         self._cache[key] = CacheEntry(
             data=data,
-            timestamp=time.time()
+            timestamp=time.time(),
+            ttl=ttl
         )
 
     def _evict(self) -> None:
-        """Ta bort gamla och sällan använda poster."""
-        now = time.time()
-
-        # Ta först bort utgångna
-        expired = [k for k, v in self._cache.items() if now - v.timestamp > self._ttl]
-        for key in expired:
-            del self._cache[key]
-
-        # Om fortfarande full, ta bort de minst använda
-        if len(self._cache) >= self._max_size:
-            # Sortera efter hits (lägst först)
-            sorted_keys = sorted(
-                self._cache.keys(),
-                key=lambda k: (self._cache[k].hits, self._cache[k].timestamp)
-            )
-            # Ta bort 20% av de minst använda
-            to_remove = len(sorted_keys) // 5 or 1
-            for key in sorted_keys[:to_remove]:
-                del self._cache[key]
+        """Ta bort minst nyligen använda poster tills det finns plats."""
+        while len(self._cache) >= self._max_size:
+            self._cache.popitem(last=False)
 
     def clear(self) -> None:
         """Rensa hela cachen."""
@@ -178,14 +325,49 @@ class SimpleCache:
             "size": len(self._cache),
             "max_size": self._max_size,
             "ttl_seconds": self._ttl,
+            "max_entry_bytes": self._max_bytes,
             "hits": self._hits,
             "misses": self._misses,
+            "skipped_too_large": self._skipped_size,
             "hit_rate": f"{(self._hits / total * 100):.1f}%" if total > 0 else "N/A"
         }
 
 
 # Global cache-instans
-cache = SimpleCache(ttl=Config.CACHE_TTL, max_size=Config.CACHE_MAX_SIZE)
+cache = SimpleCache(
+    ttl=Config.CACHE_TTL,
+    max_size=Config.CACHE_MAX_SIZE,
+    max_bytes=Config.CACHE_MAX_BYTES
+)
+
+# Cache-livslängd per "värd/sökväg"-prefix, första träff gäller. None betyder
+# cachens standard (Config.CACHE_TTL). Sökningar ändras med datan och cachas
+# kort; entiteter, termer och vokabulärer på id.kb.se ändras sällan.
+CACHE_TTL_RULES: List[Tuple[str, Optional[int]]] = [
+    ("id.kb.se/find", None),
+    ("id.kb.se/", Config.IDKB_CACHE_TTL),
+]
+
+
+def _default_ttl(url: str) -> Optional[int]:
+    """Returnerar TTL enligt CACHE_TTL_RULES för en URL, eller None för cachens standard."""
+    parts = urlsplit(url)
+    target = f"{parts.hostname or ''}{parts.path}"
+    for prefix, ttl in CACHE_TTL_RULES:
+        if target.startswith(prefix):
+            logger.debug("Cache-TTL för %s: %s (regel %s)", url, ttl or "standard", prefix)
+            return ttl
+    return None
+
+
+# Statuskoder som cachas kort så att ogiltiga ID:n inte anropas om och om igen
+NEGATIVE_CACHE_STATUS_CODES = {404, 410}
+
+
+def _is_cacheable(response: httpx.Response) -> bool:
+    """Respekterar Cache-Control: no-store och private från servern."""
+    cache_control = response.headers.get("cache-control", "").lower()
+    return "no-store" not in cache_control and "private" not in cache_control
 
 
 # ============================================================================
@@ -195,20 +377,63 @@ cache = SimpleCache(ttl=Config.CACHE_TTL, max_size=Config.CACHE_MAX_SIZE)
 # HTTP-statuskoder som ska triggera retry
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
-# Exceptions som ska triggera retry
+# Exceptions som ska triggera retry (inkl. keep-alive-anslutningar som servern stängt)
 RETRYABLE_EXCEPTIONS = (
     httpx.TimeoutException,
     httpx.ConnectError,
     httpx.ConnectTimeout,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
 )
 
 
+def _backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    response: Optional[httpx.Response] = None
+) -> float:
+    """
+    Beräknar väntetid före nästa försök.
+
+    Exponentiell backoff med jitter (halva fördröjningen slumpas) så att
+    parallella anrop inte försöker igen samtidigt. Retry-After från
+    servern (429/503) respekteras, begränsat till max_delay.
+    """
+    delay = min(base_delay * (2 ** attempt), max_delay)
+    delay = random.uniform(delay / 2, delay)
+
+    if response is not None:
+        retry_after = _retry_after_seconds(response.headers.get("retry-after", ""))
+        if retry_after is not None:
+            # Vänta minst så länge servern begär, men aldrig längre än max_delay
+            return min(max(delay, retry_after), max_delay)
+
+    return delay
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """Tolkar Retry-After som sekunder eller HTTP-datum. None om värdet saknas/är ogiltigt."""
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
 async def retry_with_backoff(
     func,
     *args,
-    max_retries: int = None,
-    base_delay: float = None,
-    max_delay: float = None,
+    max_retries: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
     **kwargs
 ) -> Any:
     """
@@ -226,9 +451,9 @@ async def retry_with_backoff(
     Raises:
         Senaste exception om alla försök misslyckas
     """
-    max_retries = max_retries or Config.MAX_RETRIES
-    base_delay = base_delay or Config.RETRY_BASE_DELAY
-    max_delay = max_delay or Config.RETRY_MAX_DELAY
+    max_retries = Config.MAX_RETRIES if max_retries is None else max_retries
+    base_delay = Config.RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = Config.RETRY_MAX_DELAY if max_delay is None else max_delay
 
     last_exception = None
 
@@ -244,10 +469,10 @@ async def retry_with_backoff(
                 raise
 
             if attempt < max_retries:
-                delay = min(base_delay * (2 ** attempt), max_delay)
+                delay = _backoff_delay(attempt, base_delay, max_delay, e.response)
                 logger.warning(
-                    f"HTTP {status}, försök {attempt + 1}/{max_retries + 1}, "
-                    f"väntar {delay:.1f}s"
+                    "HTTP %s, försök %d/%d, väntar %.1fs",
+                    status, attempt + 1, max_retries + 1, delay
                 )
                 await asyncio.sleep(delay)
 
@@ -255,10 +480,10 @@ async def retry_with_backoff(
             last_exception = e
 
             if attempt < max_retries:
-                delay = min(base_delay * (2 ** attempt), max_delay)
+                delay = _backoff_delay(attempt, base_delay, max_delay)
                 logger.warning(
-                    f"{type(e).__name__}, försök {attempt + 1}/{max_retries + 1}, "
-                    f"väntar {delay:.1f}s"
+                    "%s, försök %d/%d, väntar %.1fs",
+                    type(e).__name__, attempt + 1, max_retries + 1, delay
                 )
                 await asyncio.sleep(delay)
 
@@ -276,12 +501,18 @@ class KBApiClient:
     Features:
     - Automatisk retry med exponentiell backoff
     - In-memory caching
-    - Connection pooling
+    - Sammanslagning av samtidiga identiska anrop (single-flight)
+    - Connection pooling med keep-alive och HTTP/2 (om h2 finns)
     - Konfigurerbar via miljövariabler
     """
 
     def __init__(self):
         self._client: Optional[httpx.AsyncClient] = None
+        # Pågående GET-anrop per cache-nyckel (single-flight)
+        self._inflight: Dict[Tuple, "asyncio.Future[httpx.Response]"] = {}
+        # Tak för samtidiga anrop mot KB:s API:er (gäller varje försök,
+        # så att väntan mellan retry-försök inte håller en plats)
+        self._request_slots = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
 
     async def get_client(self) -> httpx.AsyncClient:
         """Returnerar eller skapar HTTP-klient med connection pooling."""
@@ -291,18 +522,56 @@ class KBApiClient:
                 connect=Config.CONNECT_TIMEOUT
             )
             limits = httpx.Limits(
-                max_keepalive_connections=10,
-                max_connections=20,
-                keepalive_expiry=30.0
+                max_keepalive_connections=Config.MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=Config.MAX_CONNECTIONS,
+                keepalive_expiry=Config.KEEPALIVE_EXPIRY
             )
+            if Config.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+                logger.warning("HTTP/2 är aktiverat men h2 saknas - använder HTTP/1.1 (pip install 'httpx[http2]')")
+            # Accept-Encoding sätts av httpx: gzip och deflate, samt br om
+            # brotli är installerat - sätts den manuellt kan svaret bli oläsbart.
+            # Accept är JSON som standard; anrop skickar bara egen Accept vid avvikelse.
             self._client = httpx.AsyncClient(
                 timeout=timeout,
                 limits=limits,
+                http2=Config.HTTP2_ENABLED and HTTP2_AVAILABLE,
                 follow_redirects=True,
-                headers={"User-Agent": Config.USER_AGENT}
+                headers={"User-Agent": Config.USER_AGENT, "Accept": ACCEPT_JSON}
             )
         return self._client
 
+    async def prewarm_dns(self) -> Dict[str, bool]:
+        """
+        Slår upp KB:s värdnamn parallellt så att första anropet slipper vänta på DNS.
+
+        Uppslagningen går via event loopens getaddrinfo (körs i trådpool)
+        och fyller OS:ets DNS-cache. Fel ignoreras - anropet görs om vid
+        första riktiga förfrågan.
+
+        Returns:
+            Dict med värdnamn och om uppslagningen lyckades
+        """
+        hosts = sorted({urlsplit(url).hostname for url in URLS.values()})
+        loop = asyncio.get_running_loop()
+
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    loop.getaddrinfo(host, 443, type=socket.SOCK_STREAM),
+                    timeout=Config.CONNECT_TIMEOUT
+                )
+                for host in hosts
+            ),
+            return_exceptions=True
+        )
+
+        status = {}
+        for host, result in zip(hosts, results):
+            status[host] = not isinstance(result, BaseException)
+            if not status[host]:
+                logger.debug("DNS-uppslagning misslyckades för %s: %s", host, result)
+        return status
+
     async def close(self):
         """Stänger HTTP-klienten."""
         if self._client and not self._client.is_closed:
@@ -312,15 +581,16 @@ class KBApiClient:
         self,
         url: str,
         params: Optional[Dict[str, Any]] = None,
-        accept: str = "application/json"
+        accept: str = ACCEPT_JSON
     ) -> httpx.Response:
         """Intern GET utan retry/cache."""
         client = await self.get_client()
-        response = await client.get(
-            url,
-            params=params,
-            headers={"Accept": accept}
-        )
+        async with self._request_slots:
+            response = await client.get(
+                url,
+                params=params,
+                headers=None if accept == ACCEPT_JSON else {"Accept": accept}
+            )
         response.raise_for_status()
         return response
 
@@ -328,19 +598,25 @@ class KBApiClient:
         self,
         url: str,
         params: Optional[Dict[str, Any]] = None,
-        accept: str = "application/json",
+        accept: str = ACCEPT_JSON,
         use_cache: bool = True,
-        retry: bool = True
+        retry: bool = True,
+        cache_ttl: Optional[int] = None
     ) -> httpx.Response:
         """
         Gör GET-anrop med automatisk retry och caching.
 
+        Samtidiga identiska anrop slås ihop: bara det första går ut mot
+        servern, övriga väntar på samma svar.
+
         Args:
             url: URL att hämta
             params: Query-parametrar
             accept: Accept-header
             use_cache: Använd cache (default True)
             retry: Använd retry vid fel (default True)
+            cache_ttl: Egen cache-livslängd i sekunder (default TTL enligt
+                CACHE_TTL_RULES, annars Config.CACHE_TTL)
 
         Returns:
             httpx.Response
@@ -349,20 +625,98 @@ class KBApiClient:
         if use_cache:
             cached = cache.get(url, params, accept)
             if cached is not None:
-                logger.debug(f"Cache hit: {url}")
+                logger.debug("Cache hit: %s", url)
+                if cached.is_error:
+                    # Cachat 404/410 - nytt undantag varje gång (inte samma objekt)
+                    raise httpx.HTTPStatusError(
+                        f"{cached.status_code} (cachat svar) för {url}",
+                        request=cached.request,
+                        response=cached
+                    )
                 return cached
 
-        # Gör anropet med eller utan retry
-        if retry:
-            response = await retry_with_backoff(
-                self._do_get, url, params=params, accept=accept
+        # Anslut till ett pågående identiskt anrop om det finns
+        return await self._coalesce(
+            cache._make_key(url, params, accept),
+            url,
+            lambda: self._fetch(
+                url,
+                params=params,
+                accept=accept,
+                use_cache=use_cache,
+                retry=retry,
+                cache_ttl=cache_ttl
             )
+        )
+
+    def get_cached(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        accept: str = ACCEPT_JSON
+    ) -> Optional[httpx.Response]:
+        """Returnerar ett cachat lyckat svar utan att anropa servern, annars None."""
+        cached = cache.get(url, params, accept)
+        if cached is None or cached.is_error:
+            return None
+        return cached
+
+    async def _coalesce(
+        self,
+        key: Tuple,
+        url: str,
+        start: Callable[[], Any]
+    ) -> httpx.Response:
+        """
+        Kör anropet från start() om inget identiskt anrop pågår, annars
+        väntas på det pågående anropets svar.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight_done(key, t))
         else:
-            response = await self._do_get(url, params=params, accept=accept)
+            logger.debug("Väntar på pågående anrop: %s", url)
+
+        # shield: en avbruten anropare ska inte avbryta anropet för övriga
+        return await asyncio.shield(task)
+
+    def _inflight_done(self, key: Tuple, task: "asyncio.Future[httpx.Response]") -> None:
+        """Tar bort ett avslutat anrop från listan över pågående anrop."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Markera eventuellt fel som hämtat om alla anropare avbrutits
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        accept: str = ACCEPT_JSON,
+        use_cache: bool = True,
+        retry: bool = True,
+        cache_ttl: Optional[int] = None
+    ) -> httpx.Response:
+        """Gör anropet (med eller utan retry) och sparar svaret i cache."""
+        try:
+            if retry:
+                response = await retry_with_backoff(
+                    self._do_get, url, params=params, accept=accept
+                )
+            else:
+                response = await self._do_get(url, params=params, accept=accept)
+        except httpx.HTTPStatusError as e:
+            # Negativ cache: kom ihåg saknade resurser en kort stund
+            if use_cache and e.response.status_code in NEGATIVE_CACHE_STATUS_CODES:
+                cache.set(url, e.response, params, accept, ttl=Config.NEGATIVE_CACHE_TTL)
+            raise
 
         # Spara i cache
-        if use_cache:
-            cache.set(url, response, params, accept)
+        if use_cache and _is_cacheable(response):
+            ttl = cache_ttl if cache_ttl is not None else _default_ttl(url)
+            cache.set(url, response, params, accept, ttl=ttl, size=len(response.content))
 
         return response
 
@@ -370,45 +724,121 @@ class KBApiClient:
         self,
         url: str,
         data: Optional[Dict[str, Any]] = None,
-        accept: str = "application/json",
+        accept: str = ACCEPT_JSON,
         content_type: str = "application/x-www-form-urlencoded"
     ) -> httpx.Response:
-        """Intern POST utan retry."""
+        """
+        Intern POST utan retry.
+
+        Svaret strömmas och avbryts om den avkodade storleken (efter gzip/br)
+        överstiger Config.MAX_RESPONSE_BYTES, så att en fråga utan LIMIT inte
+        laddar ner hela grafen till minnet.
+        """
         client = await self.get_client()
-        response = await client.post(
-            url,
-            data=data,
-            headers={"Accept": accept, "Content-Type": content_type}
+        limit = Config.MAX_RESPONSE_BYTES
+        async with self._request_slots:
+            async with client.stream(
+                "POST",
+                url,
+                data=data,
+                headers={"Accept": accept, "Content-Type": content_type}
+            ) as response:
+                if response.is_error:
+                    # Läs felsvaret så att e.response.text fungerar för anroparen
+                    await response.aread()
+                    response.raise_for_status()
+
+                # Avbryt direkt om servern redan angett en för stor storlek
+                # (komprimerad storlek - den avkodade är minst lika stor)
+                declared = response.headers.get("content-length")
+                if declared and declared.isdigit() and int(declared) > limit:
+                    raise ResponseTooLargeError(url, limit)
+
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > limit:
+                        raise ResponseTooLargeError(url, limit)
+                    chunks.append(chunk)
+
+        # Bygg ett fullständigt svar av den redan avkodade kroppen - utan
+        # Content-Encoding/Content-Length som gällde den komprimerade
+        headers = response.headers.copy()
+        headers.pop("content-encoding", None)
+        headers.pop("content-length", None)
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=b"".join(chunks),
+            request=response.request
         )
-        response.raise_for_status()
-        return response
 
     async def post(
         self,
         url: str,
         data: Optional[Dict[str, Any]] = None,
-        accept: str = "application/json",
+        accept: str = ACCEPT_JSON,
         content_type: str = "application/x-www-form-urlencoded",
-        retry: bool = True
+        retry: bool = True,
+        use_cache: bool = False
     ) -> httpx.Response:
         """
         Gör POST-anrop med automatisk retry.
 
+        Med use_cache slås samtidiga identiska anrop ihop på samma sätt
+        som i get().
+
         Args:
             url: URL att posta till
             data: POST-data
             accept: Accept-header
             content_type: Content-Type header
             retry: Använd retry vid fel (default True)
+            use_cache: Cacha svaret (default False - bara för läsande anrop
+                som SPARQL-frågor)
 
         Returns:
             httpx.Response
         """
+        if use_cache:
+            cached = cache.get(url, data, accept, method="POST")
+            if cached is not None:
+                logger.debug("Cache hit (POST): %s", url)
+                return cached
+
+            return await self._coalesce(
+                cache._make_key(url, data, accept, method="POST"),
+                url,
+                lambda: self._send_post(url, data, accept, content_type, retry, use_cache)
+            )
+
+        return await self._send_post(url, data, accept, content_type, retry, use_cache)
+
+    async def _send_post(
+        self,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        accept: str,
+        content_type: str,
+        retry: bool,
+        use_cache: bool
+    ) -> httpx.Response:
+        """Gör POST-anropet (med eller utan retry) och sparar svaret i cache."""
         if retry:
-            return await retry_with_backoff(
+            response = await retry_with_backoff(
                 self._do_post, url, data=data, accept=accept, content_type=content_type
             )
-        return await self._do_post(url, data=data, accept=accept, content_type=content_type)
+        else:
+            response = await self._do_post(url, data=data, accept=accept, content_type=content_type)
+
+        if use_cache and _is_cacheable(response):
+            cache.set(
+                url, response, data, accept,
+                ttl=_default_ttl(url), method="POST", size=len(response.content)
+            )
+
+        return response
 
 
 # Global klientinstans
@@ -419,6 +849,29 @@ api_client = KBApiClient()
 # FELHANTERING
 # ============================================================================
 
+class ResponseTooLargeError(Exception):
+    """Svaret från servern överskred Config.MAX_RESPONSE_BYTES."""
+
+    def __init__(self, url: str, limit: int):
+        super().__init__(f"Svaret från {url} är större än {limit} bytes")
+        self.url = url
+        self.limit = limit
+
+
+# Användarvänliga meddelanden per HTTP-statuskod
+HTTP_ERROR_MESSAGES = {
+    400: "Ogiltiga parametrar. Kontrollera sökfrågan.",
+    401: "Autentisering krävs (oväntat fel).",
+    403: "Åtkomst nekad.",
+    404: "Resursen hittades inte. Kontrollera ID:t.",
+    429: "För många anrop. Försök igen om en stund.",
+    500: "Serverfel hos KB. Försök igen senare.",
+    502: "Gateway-fel. KB:s server är tillfälligt otillgänglig.",
+    503: "Tjänsten är tillfälligt otillgänglig.",
+    504: "Timeout från servern. Försök med enklare sökning."
+}
+
+
 def handle_api_error(e: Exception, context: str = "") -> str:
     """
     Enhetlig felhantering för alla API-anrop.
@@ -434,41 +887,215 @@ def handle_api_error(e: Exception, context: str = "") -> str:
 
     if isinstance(e, httpx.HTTPStatusError):
         status = e.response.status_code
-        error_messages = {
-            400: "Ogiltiga parametrar. Kontrollera sökfrågan.",
-            401: "Autentisering krävs (oväntat fel).",
-            403: "Åtkomst nekad.",
-            404: "Resursen hittades inte. Kontrollera ID:t.",
-            429: "För många anrop. Försök igen om en stund.",
-            500: "Serverfel hos KB. Försök igen senare.",
-            502: "Gateway-fel. KB:s server är tillfälligt otillgänglig.",
-            503: "Tjänsten är tillfälligt otillgänglig.",
-            504: "Timeout från servern. Försök med enklare sökning."
-        }
-        msg = error_messages.get(status, f"HTTP-fel {status}")
+        msg = HTTP_ERROR_MESSAGES.get(status) or f"HTTP-fel {status}"
         return f"{prefix}Fel: {msg}"
 
+    elif isinstance(e, ResponseTooLargeError):
+        size_mb = e.limit / (1024 * 1024)
+        return f"{prefix}Fel: Svaret är för stort (över {size_mb:.0f} MB). Begränsa frågan, t.ex. med LIMIT."
+
     elif isinstance(e, httpx.TimeoutException):
         return f"{prefix}Fel: Tidsgräns överskriden. Försök med enklare sökning."
 
     elif isinstance(e, httpx.ConnectError):
         return f"{prefix}Fel: Kunde inte ansluta till servern. Kontrollera nätverket."
 
-    elif isinstance(e, ET.ParseError):
+    elif isinstance(e, XML_PARSE_ERRORS):
         return f"{prefix}Fel: Kunde inte tolka XML-svaret från servern."
 
     elif isinstance(e, json.JSONDecodeError):
         return f"{prefix}Fel: Kunde inte tolka JSON-svaret från servern."
 
-    logger.error(f"Oväntat fel: {type(e).__name__}: {e}")
+    # Lat formatering - strängen och stacktracen byggs bara om nivån är aktiv
+    logger.error("Oväntat fel: %s: %s", type(e).__name__, e)
+    logger.debug("Stacktrace för %s", context or "okänd kontext", exc_info=e)
     return f"{prefix}Fel: {type(e).__name__} - {str(e)}"
 
 
+# ============================================================================
+# JSON-PARSNING
+# ============================================================================
+
+def parse_json(response: httpx.Response) -> Any:
+    """
+    Parsar ett JSON-svar, med orjson direkt på råbytes om det finns.
+
+    Args:
+        response: HTTP-svar med JSON-kropp
+
+    Returns:
+        Parsad JSON-data
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def response_preview(response: httpx.Response, max_chars: int) -> str:
+    """
+    Returnerar de första max_chars tecknen av svaret utan att avkoda hela kroppen.
+
+    Ett tecken är högst 4 byte, så 4 * max_chars byte räcker alltid.
+    Resultatet är detsamma som response.text[:max_chars].
+    """
+    head = response.content[:max_chars * 4]
+    return head.decode(response.encoding or "utf-8", errors="replace")[:max_chars]
+
+
+# Delad encoder för json-fallbacken - json.dumps med argument skapar en ny per anrop.
+# encode() har inget tillstånd mellan anrop och kan användas från formaterings-trådarna.
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def dump_json(data: Any) -> str:
+    """
+    Serialiserar data till indenterad JSON för JSON-utdata från verktygen.
+
+    Använder orjson om det finns, annars json.dumps(indent=2, ensure_ascii=False).
+
+    Args:
+        data: JSON-serialiserbar data
+
+    Returns:
+        JSON-sträng med två stegs indrag
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # T.ex. heltal större än 64 bitar - låt json hantera dem
+            pass
+    return _JSON_ENCODER.encode(data)
+
+
+# Kompakt encoder för NDJSON - en post per rad utan radbrytningar inuti
+_NDJSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dump_ndjson(items: List[Any]) -> str:
+    """
+    Serialiserar en lista till NDJSON (JSON Lines) - ett kompakt objekt per rad.
+
+    Args:
+        items: Lista med JSON-serialiserbara poster
+
+    Returns:
+        NDJSON-sträng
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return "\n".join(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS).decode() for item in items)
+        except TypeError:
+            pass
+    return "\n".join(_NDJSON_ENCODER.encode(item) for item in items)
+
+
 # ============================================================================
 # XML-PARSNING
 # ============================================================================
 
-def parse_ksamsok_xml(xml_text: str) -> Dict[str, Any]:
+# Fel som kan uppstå vid XML-parsning (ElementTree och lxml)
+XML_PARSE_ERRORS: Tuple[type, ...] = (ET.ParseError,)
+if LXML_AVAILABLE:
+    XML_PARSE_ERRORS += (lxml_etree.XMLSyntaxError,)
+
+# Namnrymder
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+KSAM_NS = "http://kulturarvsdata.se/ksamsok#"
+OAI_NS = "http://www.openarchives.org/OAI/2.0/"
+
+
+def _iterparse(xml_text: Union[str, bytes], tags: Tuple[str, ...]) -> Iterator[Any]:
+    """
+    Itererar över färdigparsade element med angivna taggar.
+
+    Använder lxml om det finns, annars ElementTree. Varje element rensas
+    när anroparen har behandlat det, så minnet hålls konstant oavsett
+    svarets storlek.
+
+    Args:
+        xml_text: XML-dokument som sträng eller bytes
+        tags: Fullständiga taggnamn (med {namnrymd}) att returnera
+
+    Yields:
+        Element vars sluttagg har lästs
+    """
+    if LXML_AVAILABLE:
+        if isinstance(xml_text, str):
+            # Strängen är redan avkodad - bortse från encoding-deklarationen
+            source, encoding = io.BytesIO(xml_text.encode("utf-8")), "utf-8"
+        else:
+            source, encoding = io.BytesIO(xml_text), None
+        context = lxml_etree.iterparse(
+            source,
+            events=("end",),
+            tag=tags,
+            encoding=encoding,
+            resolve_entities=False,
+            no_network=True,
+        )
+        for _, elem in context:
+            yield elem
+            elem.clear()
+            # Ta bort redan behandlade syskon så att trädet inte växer
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return
+
+    source = io.BytesIO(xml_text) if isinstance(xml_text, bytes) else io.StringIO(xml_text)
+    for _, elem in ET.iterparse(source, events=("end",)):
+        if elem.tag in tags:
+            yield elem
+            elem.clear()
+
+
+# K-samsök-taggar -> fältnamn i resultatet (ordningen är fältens ordning i posten)
+_KSAMSOK_FIELDS = {
+    f"{{{KSAM_NS}}}itemLabel": "label",
+    f"{{{KSAM_NS}}}itemDescription": "description",
+    f"{{{KSAM_NS}}}itemType": "type",
+    f"{{{KSAM_NS}}}url": "url",
+    f"{{{KSAM_NS}}}thumbnail": "thumbnail",
+    f"{{{KSAM_NS}}}serviceName": "service",
+    f"{{{KSAM_NS}}}timeLabel": "time_label",
+    f"{{{KSAM_NS}}}placeLabel": "place_label",
+}
+_KSAMSOK_RDF_PATH = f".//{{{RDF_NS}}}RDF"
+_KSAMSOK_ENTITY_TAG = f"{{{KSAM_NS}}}Entity"
+_RDF_ABOUT_ATTR = f"{{{RDF_NS}}}about"
+
+
+def _parse_ksamsok_record(record: Any) -> Dict[str, Any]:
+    """Extraherar fält ur ett K-samsök record-element."""
+    item = {}
+
+    # Hitta RDF-data
+    rdf = record.find(_KSAMSOK_RDF_PATH)
+    if rdf is not None:
+        # Ett varv genom trädet i stället för en sökning per fält.
+        # Första förekomsten i dokumentordning gäller, som med find().
+        found: Dict[str, Any] = {}
+        entity = None
+        for elem in rdf.iter():
+            field_name = _KSAMSOK_FIELDS.get(elem.tag)
+            if field_name is not None:
+                if field_name not in found:
+                    found[field_name] = elem.text
+            elif entity is None and elem.tag == _KSAMSOK_ENTITY_TAG:
+                entity = elem
+
+        for field_name in _KSAMSOK_FIELDS.values():
+            if field_name in found:
+                item[field_name] = found[field_name]
+
+        # Extrahera URI från Entity
+        if entity is not None:
+            item["uri"] = entity.get(_RDF_ABOUT_ATTR, "")
+
+    return item
+
+
+def parse_ksamsok_xml(xml_text: Union[str, bytes]) -> Dict[str, Any]:
     """
     Parsar K-samsök XML-svar till dict.
 
@@ -479,41 +1106,16 @@ def parse_ksamsok_xml(xml_text: str) -> Dict[str, Any]:
         Dict med total_hits och records-lista
     """
     try:
-        root = ET.fromstring(xml_text)
-
-        # Hitta totalt antal träffar
-        total_hits_elem = root.find(".//totalHits")
-        total_hits = int(total_hits_elem.text) if total_hits_elem is not None else 0
-
+        total_hits = 0
         records = []
-        for record in root.findall(".//record"):
-            item = {}
-
-            # Hitta RDF-data
-            rdf = record.find(".//{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF")
-            if rdf is not None:
-                ns = {"ksam": "http://kulturarvsdata.se/ksamsok#"}
-
-                # Extrahera fält
-                for field_name, xpath in [
-                    ("label", ".//ksam:itemLabel"),
-                    ("description", ".//ksam:itemDescription"),
-                    ("type", ".//ksam:itemType"),
-                    ("url", ".//ksam:url"),
-                    ("thumbnail", ".//ksam:thumbnail"),
-                    ("service", ".//ksam:serviceName"),
-                    ("time_label", ".//ksam:timeLabel"),
-                    ("place_label", ".//ksam:placeLabel"),
-                ]:
-                    elem = rdf.find(xpath, ns)
-                    if elem is not None:
-                        item[field_name] = elem.text
-
-                # Extrahera URI från Entity
-                entity = rdf.find(".//{http://kulturarvsdata.se/ksamsok#}Entity")
-                if entity is not None:
-                    item["uri"] = entity.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about", "")
 
+        for elem in _iterparse(xml_text, ("totalHits", "record")):
+            if elem.tag == "totalHits":
+                # Hitta totalt antal träffar
+                total_hits = int(elem.text)
+                continue
+
+            item = _parse_ksamsok_record(elem)
             if item:
                 records.append(item)
 
@@ -522,12 +1124,26 @@ def parse_ksamsok_xml(xml_text: str) -> Dict[str, Any]:
             "records": records
         }
 
-    except ET.ParseError as e:
-        logger.error(f"XML parse error: {e}")
+    except XML_PARSE_ERRORS as e:
+        logger.error("XML parse error: %s", e)
         return {"total_hits": 0, "records": [], "error": str(e)}
 
 
-def parse_oaipmh_xml(xml_text: str) -> Dict[str, Any]:
+# OAI-PMH: namnrymd för find() och elementen som iterparse ska returnera
+_OAI_NS_MAP = {"oai": OAI_NS}
+_OAI_RECORD_TAG = f"{{{OAI_NS}}}record"
+_OAI_SET_TAG = f"{{{OAI_NS}}}set"
+_OAI_FORMAT_TAG = f"{{{OAI_NS}}}metadataFormat"
+_OAI_TOKEN_TAG = f"{{{OAI_NS}}}resumptionToken"
+_OAI_TAGS = (_OAI_RECORD_TAG, _OAI_SET_TAG, _OAI_FORMAT_TAG, _OAI_TOKEN_TAG)
+# Header-element -> fältnamn i resultatet
+_OAI_HEADER_FIELDS = {
+    f"{{{OAI_NS}}}identifier": "identifier",
+    f"{{{OAI_NS}}}datestamp": "datestamp",
+}
+
+
+def parse_oaipmh_xml(xml_text: Union[str, bytes]) -> Dict[str, Any]:
     """
     Parsar OAI-PMH XML-svar.
 
@@ -538,73 +1154,171 @@ def parse_oaipmh_xml(xml_text: str) -> Dict[str, Any]:
         Dict med records, sets och resumption_token
     """
     try:
-        root = ET.fromstring(xml_text)
-        ns = {"oai": "http://www.openarchives.org/OAI/2.0/"}
+        ns = _OAI_NS_MAP
 
         result: Dict[str, Any] = {"records": [], "resumption_token": None}
+        sets: List[Dict[str, str]] = []
+        formats: List[Dict[str, str]] = []
+        token_found = False
+        token_attrs: Dict[str, int] = {}
+
+        for elem in _iterparse(xml_text, _OAI_TAGS):
+            if elem.tag == _OAI_RECORD_TAG:
+                # Hitta records
+                item: Dict[str, Any] = {}
+
+                header = elem.find("oai:header", ns)
+                if header is not None:
+                    # Ett varv över headerns barn i stället för en find() per fält
+                    found: Dict[str, Any] = {}
+                    for child in header:
+                        field_name = _OAI_HEADER_FIELDS.get(child.tag)
+                        if field_name is not None and field_name not in found:
+                            found[field_name] = child.text
+                    for field_name in _OAI_HEADER_FIELDS.values():
+                        if field_name in found:
+                            item[field_name] = found[field_name]
+
+                metadata = elem.find("oai:metadata", ns)
+                if metadata is not None:
+                    item["has_metadata"] = True
+
+                if item:
+                    result["records"].append(item)
+
+            elif elem.tag == _OAI_SET_TAG:
+                # Hitta sets
+                spec = elem.find("oai:setSpec", ns)
+                name = elem.find("oai:setName", ns)
+                sets.append({
+                    "spec": spec.text if spec is not None else "",
+                    "name": name.text if name is not None else ""
+                })
+
+            elif elem.tag == _OAI_FORMAT_TAG:
+                # Hitta metadata formats
+                prefix = elem.find("oai:metadataPrefix", ns)
+                schema = elem.find("oai:schema", ns)
+                formats.append({
+                    "prefix": prefix.text if prefix is not None else "",
+                    "schema": schema.text if schema is not None else ""
+                })
+
+            elif elem.tag == _OAI_TOKEN_TAG and not token_found:
+                # Hitta resumption token (första förekomsten)
+                token_found = True
+                if elem.text:
+                    result["resumption_token"] = elem.text
+                    # Extrahera attribut om de finns
+                    if elem.get("completeListSize"):
+                        token_attrs["total_size"] = int(elem.get("completeListSize"))
+                    if elem.get("cursor"):
+                        token_attrs["cursor"] = int(elem.get("cursor"))
+
+        if sets:
+            result["sets"] = sets
+        if formats:
+            result["formats"] = formats
+        result.update(token_attrs)
 
-        # Hitta records
-        for record in root.findall(".//oai:record", ns):
-            item: Dict[str, Any] = {}
+        return result
 
-            header = record.find("oai:header", ns)
-            if header is not None:
-                identifier = header.find("oai:identifier", ns)
-                datestamp = header.find("oai:datestamp", ns)
-                if identifier is not None:
-                    item["identifier"] = identifier.text
-                if datestamp is not None:
-                    item["datestamp"] = datestamp.text
+    except XML_PARSE_ERRORS as e:
+        return {"error": str(e)}
 
-            metadata = record.find("oai:metadata", ns)
-            if metadata is not None:
-                item["has_metadata"] = True
 
-            if item:
-                result["records"].append(item)
-
-        # Hitta sets
-        for set_elem in root.findall(".//oai:set", ns):
-            spec = set_elem.find("oai:setSpec", ns)
-            name = set_elem.find("oai:setName", ns)
-            if "sets" not in result:
-                result["sets"] = []
-            result["sets"].append({
-                "spec": spec.text if spec is not None else "",
-                "name": name.text if name is not None else ""
-            })
-
-        # Hitta metadata formats
-        for format_elem in root.findall(".//oai:metadataFormat", ns):
-            prefix = format_elem.find("oai:metadataPrefix", ns)
-            schema = format_elem.find("oai:schema", ns)
-            if "formats" not in result:
-                result["formats"] = []
-            result["formats"].append({
-                "prefix": prefix.text if prefix is not None else "",
-                "schema": schema.text if schema is not None else ""
-            })
-
-        # Hitta resumption token
-        token = root.find(".//oai:resumptionToken", ns)
-        if token is not None and token.text:
-            result["resumption_token"] = token.text
-            # Extrahera attribut om de finns
-            if token.get("completeListSize"):
-                result["total_size"] = int(token.get("completeListSize"))
-            if token.get("cursor"):
-                result["cursor"] = int(token.get("cursor"))
+# ============================================================================
+# RDF-KONVERTERING
+# ============================================================================
 
-        return result
+# Verktygens formatnamn -> rdflib-serialiserare
+RDF_SERIALIZE_FORMATS = {
+    "turtle": "turtle",
+    "rdf": "xml"
+}
 
-    except ET.ParseError as e:
-        return {"error": str(e)}
+
+def _has_inline_context(data: Any) -> bool:
+    """True om dokumentet har en inbäddad @context (utan den tappas kompakta nycklar)."""
+    if not isinstance(data, dict):
+        return False
+    context = data.get("@context")
+    if isinstance(context, list):
+        return bool(context) and all(isinstance(c, dict) for c in context)
+    return isinstance(context, dict)
+
+
+def _has_remote_context(data: Any) -> bool:
+    """True om JSON-LD-dokumentet refererar till en extern @context (URL)."""
+    if isinstance(data, list):
+        return any(_has_remote_context(item) for item in data)
+    if not isinstance(data, dict):
+        return False
+    context = data.get("@context")
+    if isinstance(context, str):
+        return True
+    if isinstance(context, list) and any(isinstance(c, str) for c in context):
+        return True
+    return any(_has_remote_context(v) for v in data.values() if isinstance(v, (dict, list)))
+
+
+def _serialize_jsonld(data: Any, serializer: str) -> Optional[str]:
+    """Parsar JSON-LD och serialiserar grafen med rdflib (blockerande)."""
+    try:
+        import rdflib
+
+        graph = rdflib.Graph()
+        graph.parse(data=dump_json(data), format="json-ld")
+        if len(graph) == 0:
+            return None
+        return graph.serialize(format=serializer)
+    except Exception as e:
+        logger.debug("Lokal RDF-konvertering misslyckades: %s", e)
+        return None
+
+
+async def jsonld_to_rdf(data: Any, format: str) -> Optional[str]:
+    """
+    Serialiserar ett JSON-LD-dokument till Turtle eller RDF/XML med rdflib.
+
+    Avstängt som standard (Config.LOCAL_RDF_CONVERSION) eftersom resultatet
+    är samma graf men inte samma text som serverns Turtle/RDF-XML. Bara
+    dokument med inbäddad @context konverteras - med extern kontext skulle
+    rdflib hämta den med ett blockerande anrop, och utan kontext tappas
+    kompakta nycklar. Import, parsning och serialisering körs i
+    formateringens trådpool så att event loop inte blockeras.
+
+    Args:
+        data: Parsat JSON-LD-dokument
+        format: 'turtle' eller 'rdf'
+
+    Returns:
+        Serialiserad text, eller None om konvertering inte är möjlig
+        (hämta då formatet från servern istället)
+    """
+    serializer = RDF_SERIALIZE_FORMATS.get(format)
+    if (
+        not Config.LOCAL_RDF_CONVERSION
+        or not RDFLIB_AVAILABLE
+        or serializer is None
+        or not _has_inline_context(data)
+        or _has_remote_context(data)
+    ):
+        return None
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_format_executor(), _serialize_jsonld, data, serializer)
 
 
 # ============================================================================
 # FORMATERING
 # ============================================================================
 
+def _truncate(text: str, limit: int) -> str:
+    """Förkortar text till högst limit tecken, där "..." ingår när den kortas."""
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
 def format_libris_results(data: dict, format_type: str = "markdown") -> str:
     """
     Formaterar Libris-sökresultat.
@@ -616,13 +1330,13 @@ def format_libris_results(data: dict, format_type: str = "markdown") -> str:
     Returns:
         Formaterad sträng
     """
+    if format_type == "json":
+        return dump_json(data)
+
     xsearch = data.get("xsearch", {})
     records = xsearch.get("records", 0)
     items = xsearch.get("list", [])
 
-    if format_type == "json":
-        return json.dumps(data, indent=2, ensure_ascii=False)
-
     lines = [
         f"## Libris Sökresultat",
         f"**Totalt:** {records:,} träffar",
@@ -656,6 +1370,43 @@ def format_libris_results(data: dict, format_type: str = "markdown") -> str:
     return "\n".join(lines)
 
 
+def format_libris_record(data: dict) -> Optional[str]:
+    """
+    Formaterar den första posten i ett Libris-svar, t.ex. vid ISBN-sökning.
+
+    Snabbare variant av format_libris_results för svar med en enda post:
+    ingen sammanfattning av träffar och ingen numrering.
+
+    Args:
+        data: JSON-data från Libris xsearch
+
+    Returns:
+        Formaterad sträng, eller None om svaret saknar poster
+    """
+    items = data.get("xsearch", {}).get("list")
+    if not items:
+        return None
+
+    item = items[0]
+    lines = [
+        f"## {item.get('title', 'Utan titel')}",
+        f"- **Författare:** {item.get('creator', 'Okänd')}",
+        f"- **År:** {item.get('date', 'u.å.')}",
+    ]
+    if item.get("type"):
+        lines.append(f"- **Typ:** {item['type']}")
+    if item.get("publisher"):
+        lines.append(f"- **Förlag:** {item['publisher']}")
+    isbn = item.get("isbn")
+    if isbn:
+        isbn_str = ", ".join(isbn) if isinstance(isbn, list) else isbn
+        lines.append(f"- **ISBN:** {isbn_str}")
+    if item.get("identifier"):
+        lines.append(f"- **Länk:** {item['identifier']}")
+
+    return "\n".join(lines)
+
+
 def format_ksamsok_results(data: dict, format_type: str = "markdown") -> str:
     """
     Formaterar K-samsök-resultat.
@@ -668,7 +1419,7 @@ def format_ksamsok_results(data: dict, format_type: str = "markdown") -> str:
         Formaterad sträng
     """
     if format_type == "json":
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dump_json(data)
 
     total = data.get('total_hits', 0)
     records = data.get("records", [])
@@ -697,8 +1448,7 @@ def format_ksamsok_results(data: dict, format_type: str = "markdown") -> str:
         if place_label:
             lines.append(f"- **Plats:** {place_label}")
         if description:
-            desc_short = description[:300] + "..." if len(description) > 300 else description
-            lines.append(f"- **Beskrivning:** {desc_short}")
+            lines.append(f"- **Beskrivning:** {_truncate(description, 300)}")
         if thumbnail:
             lines.append(f"- **Bild:** {thumbnail}")
         if url:
@@ -713,6 +1463,12 @@ def format_ksamsok_results(data: dict, format_type: str = "markdown") -> str:
     return "\n".join(lines)
 
 
+# Tecken som skulle bryta en markdown-tabellcell: pipe escapas, radbrytningar blir mellanslag
+_SPARQL_CELL_TABLE = str.maketrans({"|": "\\|", "\n": " ", "\r": " "})
+# Delad tom bindning för variabler som saknas i en rad (skapas inte om per cell)
+_EMPTY_BINDING: Dict[str, str] = {}
+
+
 def format_sparql_results(data: dict, format_type: str = "markdown") -> str:
     """
     Formaterar SPARQL-resultat.
@@ -725,7 +1481,7 @@ def format_sparql_results(data: dict, format_type: str = "markdown") -> str:
         Formaterad sträng
     """
     if format_type == "json":
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dump_json(data)
 
     results = data.get("results", {}).get("bindings", [])
     variables = data.get("head", {}).get("vars", [])
@@ -746,15 +1502,11 @@ def format_sparql_results(data: dict, format_type: str = "markdown") -> str:
 
     # Lägg till rader
     for row in results[:100]:  # Max 100 rader
-        cells = []
-        for var in variables:
-            value = row.get(var, {}).get("value", "")
-            # Förkorta långa värden
-            if len(value) > 60:
-                value = value[:57] + "..."
-            # Escape pipe-tecken
-            value = value.replace("|", "\\|")
-            cells.append(value)
+        # Förkorta långa värden och escapa tecken som bryter tabellen
+        cells = [
+            _truncate(row.get(var, _EMPTY_BINDING).get("value", ""), 60).translate(_SPARQL_CELL_TABLE)
+            for var in variables
+        ]
         lines.append("| " + " | ".join(cells) + " |")
 
     if len(results) > 100:
@@ -774,13 +1526,13 @@ def format_swepub_results(data: dict, format_type: str = "markdown") -> str:
     Returns:
         Formaterad sträng
     """
+    if format_type == "json":
+        return dump_json(data)
+
     xsearch = data.get("xsearch", {})
     records = xsearch.get("records", 0)
     items = xsearch.get("list", [])
 
-    if format_type == "json":
-        return json.dumps(data, indent=2, ensure_ascii=False)
-
     lines = [
         f"## Swepub Sökresultat",
         f"**Totalt:** {records:,} publikationer",
@@ -810,6 +1562,61 @@ def format_swepub_results(data: dict, format_type: str = "markdown") -> str:
     return "\n".join(lines)
 
 
+# Trådpool för formatering - skapas vid första användning
+_format_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_format_executor() -> ThreadPoolExecutor:
+    """Returnerar formateringens trådpool och skapar den vid behov."""
+    global _format_executor
+
+    if _format_executor is None:
+        _format_executor = ThreadPoolExecutor(
+            max_workers=Config.FORMAT_WORKERS,
+            thread_name_prefix="kb_format"
+        )
+    return _format_executor
+
+
+def _result_size(data: Any) -> int:
+    """Uppskattar antal poster i ett API-svar (Libris, K-samsök eller SPARQL)."""
+    if not isinstance(data, dict):
+        return 0
+    if "xsearch" in data:
+        return len(data["xsearch"].get("list", []))
+    if "records" in data:
+        return len(data["records"])
+    return len(data.get("results", {}).get("bindings", []))
+
+
+async def format_async(
+    formatter: Callable[[dict, str], str],
+    data: dict,
+    format_type: str = "markdown"
+) -> str:
+    """
+    Kör en format_*_results-funktion utan att blockera event loop.
+
+    Små resultat formateras direkt eftersom trådbytet kostar mer än det
+    sparar. Resultat med fler poster än Config.FORMAT_OFFLOAD_THRESHOLD
+    formateras i en egen trådpool så att parallella verktygsanrop kan
+    fortsätta under tiden.
+
+    Args:
+        formatter: Formateringsfunktion, t.ex. format_libris_results
+        data: Data att formatera
+        format_type: 'markdown' eller 'json'
+
+    Returns:
+        Formaterad sträng
+    """
+    if _result_size(data) <= Config.FORMAT_OFFLOAD_THRESHOLD:
+        return formatter(data, format_type)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_format_executor(), formatter, data, format_type)
+
+
 # ============================================================================
 # EXPORTFORMAT
 # ============================================================================
@@ -942,11 +1749,28 @@ def get_config() -> Dict[str, Any]:
     return {
         "http_timeout": Config.HTTP_TIMEOUT,
         "connect_timeout": Config.CONNECT_TIMEOUT,
+        "max_connections": Config.MAX_CONNECTIONS,
+        "max_keepalive_connections": Config.MAX_KEEPALIVE_CONNECTIONS,
+        "max_concurrent_requests": Config.MAX_CONCURRENT_REQUESTS,
+        "keepalive_expiry": Config.KEEPALIVE_EXPIRY,
+        "http2": Config.HTTP2_ENABLED and HTTP2_AVAILABLE,
+        "dns_prewarm": Config.DNS_PREWARM,
         "max_retries": Config.MAX_RETRIES,
         "retry_base_delay": Config.RETRY_BASE_DELAY,
         "retry_max_delay": Config.RETRY_MAX_DELAY,
         "cache_enabled": Config.CACHE_ENABLED,
         "cache_ttl": Config.CACHE_TTL,
         "cache_max_size": Config.CACHE_MAX_SIZE,
+        "cache_max_bytes": Config.CACHE_MAX_BYTES,
+        "isbn_cache_ttl": Config.ISBN_CACHE_TTL,
+        "idkb_cache_ttl": Config.IDKB_CACHE_TTL,
+        "negative_cache_ttl": Config.NEGATIVE_CACHE_TTL,
+        "status_cache_ttl": Config.STATUS_CACHE_TTL,
+        "max_response_bytes": Config.MAX_RESPONSE_BYTES,
+        "sparql_default_limit": Config.SPARQL_DEFAULT_LIMIT,
+        "batch_concurrency": Config.BATCH_CONCURRENCY,
+        "format_workers": Config.FORMAT_WORKERS,
+        "format_offload_threshold": Config.FORMAT_OFFLOAD_THRESHOLD,
+        "local_rdf_conversion": Config.LOCAL_RDF_CONVERSION and RDFLIB_AVAILABLE,
         "user_agent": Config.USER_AGENT
     }
@@ -6,104 +6,67 @@ Verifierar att alla verktygsgrupper fungerar korrekt.
 
 import asyncio
 import sys
-import json
 
 # Lägg till src till path
 sys.path.insert(0, '.')
 
-from src.api_client import api_client, URLS, parse_ksamsok_xml, parse_oaipmh_xml
+from src.api_client import api_client, URLS, configure_logging, parse_json, parse_ksamsok_xml, parse_oaipmh_xml
 
 
 async def test_libris_xsearch():
     """Testar Libris Xsearch."""
-    print("\n🔍 Test: Libris Xsearch...")
-    try:
-        params = {"query": "Astrid Lindgren", "n": 5, "format": "json"}
-        response = await api_client.get(URLS["libris_xsearch"], params=params)
-        data = response.json()
-        records = data.get("xsearch", {}).get("records", 0)
-        print(f"   ✅ OK - {records} träffar för 'Astrid Lindgren'")
-        return True
-    except Exception as e:
-        print(f"   ❌ FEL: {e}")
-        return False
+    params = {"query": "Astrid Lindgren", "n": 5, "format": "json"}
+    response = await api_client.get(URLS["libris_xsearch"], params=params)
+    data = parse_json(response)
+    records = data.get("xsearch", {}).get("records", 0)
+    return f"{records} träffar för 'Astrid Lindgren'"
 
 
 async def test_libris_xl():
     """Testar Libris XL REST API."""
-    print("\n🔍 Test: Libris XL...")
-    try:
-        url = f"{URLS['libris_xl']}/find"
-        params = {"q": "Strindberg", "_limit": 3}
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
-        items = data.get("items", [])
-        print(f"   ✅ OK - {len(items)} poster för 'Strindberg'")
-        return True
-    except Exception as e:
-        print(f"   ❌ FEL: {e}")
-        return False
+    url = f"{URLS['libris_xl']}/find"
+    params = {"q": "Strindberg", "_limit": 3}
+    response = await api_client.get(url, params=params, accept="application/ld+json")
+    data = parse_json(response)
+    items = data.get("items", [])
+    return f"{len(items)} poster för 'Strindberg'"
 
 
 async def test_ksamsok():
     """Testar K-samsök."""
-    print("\n🔍 Test: K-samsök...")
-    try:
-        params = {"method": "search", "query": "text=runsten", "hitsPerPage": 5}
-        response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
-        data = parse_ksamsok_xml(response.text)
-        total = data.get("total_hits", 0)
-        print(f"   ✅ OK - {total} runstenar hittade")
-        return True
-    except Exception as e:
-        print(f"   ❌ FEL: {e}")
-        return False
+    params = {"method": "search", "query": "text=runsten", "hitsPerPage": 5}
+    response = await api_client.get(URLS["ksamsok"], params=params, accept="application/xml")
+    data = parse_ksamsok_xml(response.content)
+    total = data.get("total_hits", 0)
+    return f"{total} runstenar hittade"
 
 
 async def test_oaipmh():
     """Testar OAI-PMH."""
-    print("\n🔍 Test: OAI-PMH...")
-    try:
-        params = {"verb": "ListSets"}
-        response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
-        data = parse_oaipmh_xml(response.text)
-        sets = data.get("sets", [])
-        print(f"   ✅ OK - {len(sets)} sets tillgängliga")
-        return True
-    except Exception as e:
-        print(f"   ❌ FEL: {e}")
-        return False
+    params = {"verb": "ListSets"}
+    response = await api_client.get(URLS["libris_oaipmh"], params=params, accept="application/xml")
+    data = parse_oaipmh_xml(response.content)
+    sets = data.get("sets", [])
+    return f"{len(sets)} sets tillgängliga"
 
 
 async def test_idkb():
     """Testar id.kb.se."""
-    print("\n🔍 Test: id.kb.se...")
-    try:
-        url = f"{URLS['idkb']}/find"
-        params = {"q": "Strindberg", "_limit": 5}
-        response = await api_client.get(url, params=params, accept="application/ld+json")
-        data = response.json()
-        items = data.get("items", [])
-        print(f"   ✅ OK - {len(items)} auktoriteter för 'Strindberg'")
-        return True
-    except Exception as e:
-        print(f"   ❌ FEL: {e}")
-        return False
+    url = f"{URLS['idkb']}/find"
+    params = {"q": "Strindberg", "_limit": 5}
+    response = await api_client.get(url, params=params, accept="application/ld+json")
+    data = parse_json(response)
+    items = data.get("items", [])
+    return f"{len(items)} auktoriteter för 'Strindberg'"
 
 
 async def test_swepub():
     """Testar Swepub."""
-    print("\n🔍 Test: Swepub...")
-    try:
-        params = {"query": "climate", "database": "swepub", "n": 5, "format": "json"}
-        response = await api_client.get(URLS["swepub"], params=params)
-        data = response.json()
-        records = data.get("xsearch", {}).get("records", 0)
-        print(f"   ✅ OK - {records} forskningspublikationer")
-        return True
-    except Exception as e:
-        print(f"   ❌ FEL: {e}")
-        return False
+    params = {"query": "climate", "database": "swepub", "n": 5, "format": "json"}
+    response = await api_client.get(URLS["swepub"], params=params)
+    data = parse_json(response)
+    records = data.get("xsearch", {}).get("records", 0)
+    return f"{records} forskningspublikationer"
 
 
 async def run_all_tests():
@@ -113,18 +76,26 @@ async def run_all_tests():
     print("=" * 60)
     
     tests = [
-        test_libris_xsearch,
-        test_libris_xl,
-        test_ksamsok,
-        test_oaipmh,
-        test_idkb,
-        test_swepub,
+        ("Libris Xsearch", test_libris_xsearch),
+        ("Libris XL", test_libris_xl),
+        ("K-samsök", test_ksamsok),
+        ("OAI-PMH", test_oaipmh),
+        ("id.kb.se", test_idkb),
+        ("Swepub", test_swepub),
     ]
     
+    # Testerna går mot olika tjänster och är oberoende - kör dem parallellt
+    # och skriv ut resultaten i fast ordning när alla är klara
+    outcomes = await asyncio.gather(*(test() for _, test in tests), return_exceptions=True)
     results = []
-    for test in tests:
-        result = await test()
-        results.append(result)
+    for (name, _), outcome in zip(tests, outcomes):
+        print(f"\n🔍 Test: {name}...")
+        if isinstance(outcome, BaseException):
+            print(f"   ❌ FEL: {outcome}")
+            results.append(False)
+        else:
+            print(f"   ✅ OK - {outcome}")
+            results.append(True)
     
     await api_client.close()
     
@@ -138,5 +109,6 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
+    configure_logging()
     success = asyncio.run(run_all_tests())
     sys.exit(0 if success else 1)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+KB MCP Server - Offline-tester för cache-livslängd per endpoint
+Kontrollerar att id.kb.se-sökningar cachas kort och entiteter länge.
+
+Kör med: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Lägg till projektroten till path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.api_client import Config, URLS, _default_ttl
+
+
+class TestDefaultTtl(unittest.TestCase):
+    """Testar _default_ttl."""
+
+    def test_idkb_search_uses_standard_ttl(self):
+        self.assertIsNone(_default_ttl(f"{URLS['idkb']}/find"))
+        self.assertIsNone(_default_ttl(f"{URLS['idkb']}/find?q=Strindberg&_limit=5"))
+
+    def test_idkb_entities_use_long_ttl(self):
+        for path in ("term/sao/Politik", "vocab/Person", "language/swe"):
+            with self.subTest(path=path):
+                self.assertEqual(_default_ttl(f"{URLS['idkb']}/{path}"), Config.IDKB_CACHE_TTL)
+
+    def test_other_hosts_use_standard_ttl(self):
+        for url in (URLS["libris_xsearch"], URLS["ksamsok"], URLS["libris_sparql"]):
+            with self.subTest(url=url):
+                self.assertIsNone(_default_ttl(url))
+
+
+if __name__ == "__main__":
+    unittest.main()
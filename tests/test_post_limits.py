@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+KB MCP Server - Offline-tester för POST-anrop
+Kontrollerar storleksgränsen för avkodade svar och att felsvar går att läsa.
+
+Kör med: python -m unittest discover tests
+"""
+
+import asyncio
+import gzip
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+
+# Lägg till projektroten till path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.api_client import Config, KBApiClient, ResponseTooLargeError
+
+
+def gzip_response(body: bytes, status_code: int = 200) -> httpx.Response:
+    """Gzip-komprimerat svar som strömmas, som från en riktig transport."""
+    compressed = gzip.compress(body)
+    return httpx.Response(
+        status_code,
+        headers={"content-encoding": "gzip", "content-length": str(len(compressed))},
+        stream=httpx.ByteStream(compressed)
+    )
+
+
+def post(handler, **kwargs) -> httpx.Response:
+    """Gör ett POST-anrop utan retry mot en mock-transport."""
+    async def run():
+        client = KBApiClient()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await client.post("https://example.org/sparql", data={"query": "ASK {}"},
+                                     retry=False, **kwargs)
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+class TestPostResponseLimit(unittest.TestCase):
+    """Testar Config.MAX_RESPONSE_BYTES i _do_post."""
+
+    @mock.patch.object(Config, "MAX_RESPONSE_BYTES", 1000)
+    def test_limit_applies_to_decoded_size(self):
+        body = b"a" * 5000
+        self.assertLess(len(gzip.compress(body)), 1000)
+        with self.assertRaises(ResponseTooLargeError):
+            post(lambda request: gzip_response(body))
+
+    @mock.patch.object(Config, "MAX_RESPONSE_BYTES", 1000)
+    def test_decoded_response_is_rebuilt_without_encoding(self):
+        body = b'{"boolean": true}'
+        response = post(lambda request: gzip_response(body))
+        self.assertEqual(response.content, body)
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.json(), {"boolean": True})
+
+
+class TestPostErrors(unittest.TestCase):
+    """Testar felsvar från _do_post."""
+
+    def test_error_response_is_read(self):
+        def handler(request):
+            return httpx.Response(404, stream=httpx.ByteStream(b"Not found"))
+
+        with self.assertRaises(httpx.HTTPStatusError) as ctx:
+            post(handler)
+        self.assertEqual(ctx.exception.response.status_code, 404)
+        self.assertEqual(ctx.exception.response.text, "Not found")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+KB MCP Server - Offline-tester för lokal RDF-konvertering
+Kontrollerar att jsonld_to_rdf är avstängd som standard, bara konverterar
+dokument med inbäddad @context och att grafen blir densamma som källans.
+
+Kör med: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+# Lägg till projektroten till path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import api_client
+from src.api_client import Config, RDFLIB_AVAILABLE, dump_json, jsonld_to_rdf
+
+DOCUMENT = {
+    "@context": {
+        "@vocab": "http://purl.org/dc/terms/",
+        "kb": "https://data.kb.se/"
+    },
+    "@id": "kb:abc123",
+    "title": "Röda rummet",
+    "creator": {"@id": "kb:person/1", "name": "August Strindberg"},
+    "subject": ["Roman", "Stockholm"]
+}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestJsonldToRdf(unittest.TestCase):
+    """Testar jsonld_to_rdf."""
+
+    def test_disabled_by_default(self):
+        with mock.patch.object(Config, "LOCAL_RDF_CONVERSION", False):
+            self.assertIsNone(run(jsonld_to_rdf(DOCUMENT, "turtle")))
+
+    @mock.patch.object(Config, "LOCAL_RDF_CONVERSION", True)
+    def test_requires_inline_context(self):
+        without_context = {k: v for k, v in DOCUMENT.items() if k != "@context"}
+        remote_context = {**without_context, "@context": "https://id.kb.se/context.jsonld"}
+        for data in (without_context, remote_context):
+            with self.subTest(data=data.get("@context")):
+                self.assertIsNone(run(jsonld_to_rdf(data, "turtle")))
+
+    @mock.patch.object(Config, "LOCAL_RDF_CONVERSION", True)
+    def test_unknown_format(self):
+        self.assertIsNone(run(jsonld_to_rdf(DOCUMENT, "ntriples")))
+
+    @unittest.skipUnless(RDFLIB_AVAILABLE, "rdflib saknas")
+    @mock.patch.object(Config, "LOCAL_RDF_CONVERSION", True)
+    def test_output_is_isomorphic_to_source_graph(self):
+        import rdflib
+        from rdflib.compare import isomorphic
+
+        source = rdflib.Graph().parse(data=dump_json(DOCUMENT), format="json-ld")
+        for format, parser in (("turtle", "turtle"), ("rdf", "xml")):
+            with self.subTest(format=format):
+                text = run(jsonld_to_rdf(DOCUMENT, format))
+                self.assertIsNotNone(text)
+                converted = rdflib.Graph().parse(data=text, format=parser)
+                self.assertEqual(len(converted), len(source))
+                self.assertTrue(isomorphic(converted, source))
+
+    @unittest.skipUnless(RDFLIB_AVAILABLE, "rdflib saknas")
+    @mock.patch.object(Config, "LOCAL_RDF_CONVERSION", True)
+    def test_runs_in_format_executor(self):
+        threads = []
+        serialize = api_client._serialize_jsonld
+
+        def record_thread(*args):
+            threads.append(threading.current_thread().name)
+            return serialize(*args)
+
+        with mock.patch.object(api_client, "_serialize_jsonld", record_thread):
+            self.assertIsNotNone(run(jsonld_to_rdf(DOCUMENT, "turtle")))
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("kb_format"))
+
+
+if __name__ == "__main__":
+    unittest.main()
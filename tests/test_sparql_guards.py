@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+KB MCP Server - Offline-tester för SPARQL-skydden
+Kontrollerar avvisning av SPARQL Update och automatisk LIMIT utan nätverk.
+
+Kör med: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Lägg till projektroten till path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from kb_mcp_server import _ensure_limit, _is_sparql_update
+
+
+class TestSparqlUpdateCheck(unittest.TestCase):
+    """Testar _is_sparql_update."""
+
+    def test_update_operations_are_rejected(self):
+        queries = [
+            "DROP ALL",
+            "drop silent graph <http://example.org/g>",
+            "CLEAR DEFAULT",
+            "INSERT DATA { <a> <b> <c> }",
+            "DELETE WHERE { ?s ?p ?o }",
+            "WITH <http://example.org/g> DELETE { ?s ?p ?o } WHERE { ?s ?p ?o }",
+            "LOAD <http://example.org/data.ttl>",
+            "COPY DEFAULT TO <http://example.org/g>",
+            "PREFIX dc: <http://purl.org/dc/terms/>\nINSERT DATA { <a> dc:title 'x' }",
+            "BASE <http://example.org/>\nDELETE DATA { <a> <b> <c> }",
+            "# kommentar\nDROP ALL",
+            "SELECT * WHERE { ?s ?p ?o } ; DROP ALL",
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertTrue(_is_sparql_update(query))
+
+    def test_read_queries_are_accepted(self):
+        queries = [
+            "SELECT ?copy WHERE { ?copy <http://purl.org/dc/terms/title> ?t }",
+            'SELECT ?s WHERE { ?s ?p "Drop all" }',
+            'SELECT ?s WHERE { ?s ?p ?o FILTER(CONTAINS(?o, "delete where")) }',
+            "SELECT $move WHERE { $move ?p ?o }",
+            "PREFIX ex: <http://example.org/>\nSELECT ?s WHERE { ?s ex:copy ex:drop }",
+            "SELECT ?s WHERE { ?s ?p ?o } # DROP ALL",
+            "SELECT ?s WHERE { ?s <http://example.org/delete> ?o }",
+            "ASK { ?s ?p 'insert data' }",
+            "DESCRIBE <http://example.org/clear>",
+            "CONSTRUCT { ?s ?p ?o } WHERE { ?s ?p ?o }",
+            'SELECT ?s WHERE { ?s ?p """\nDROP ALL\n""" }',
+            "SELECT ?x WHERE { ?x ?p ?n FILTER(?n < 5) } ",
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertFalse(_is_sparql_update(query))
+
+
+class TestEnsureLimit(unittest.TestCase):
+    """Testar _ensure_limit."""
+
+    def test_adds_limit_to_select_without_limit(self):
+        self.assertEqual(
+            _ensure_limit("SELECT ?s WHERE { ?s ?p ?o }", 10),
+            "SELECT ?s WHERE { ?s ?p ?o }\nLIMIT 10"
+        )
+
+    def test_keeps_existing_limit(self):
+        query = "SELECT ?s WHERE { ?s ?p ?o } ORDER BY ?s limit 5"
+        self.assertEqual(_ensure_limit(query, 10), query)
+
+    def test_limit_goes_before_trailing_values(self):
+        self.assertEqual(
+            _ensure_limit("SELECT ?s WHERE { ?s ?p ?t } VALUES ?t { <a> }", 10),
+            "SELECT ?s WHERE { ?s ?p ?t }\nLIMIT 10\nVALUES ?t { <a> }"
+        )
+
+    def test_inline_values_are_not_trailing(self):
+        self.assertEqual(
+            _ensure_limit("SELECT ?s WHERE { VALUES ?t { <a> } ?s ?p ?t }", 10),
+            "SELECT ?s WHERE { VALUES ?t { <a> } ?s ?p ?t }\nLIMIT 10"
+        )
+
+    def test_limit_in_literal_or_comment_does_not_count(self):
+        self.assertEqual(
+            _ensure_limit('SELECT ?s WHERE { ?s ?p "limit 5" }', 10),
+            'SELECT ?s WHERE { ?s ?p "limit 5" }\nLIMIT 10'
+        )
+        self.assertEqual(
+            _ensure_limit("SELECT ?s WHERE { ?s ?p ?o } # LIMIT 5", 10),
+            "SELECT ?s WHERE { ?s ?p ?o } # LIMIT 5\nLIMIT 10"
+        )
+
+    def test_subquery_limit_does_not_cap_outer_select(self):
+        query = "SELECT ?s WHERE { { SELECT ?s WHERE { ?s ?p ?o } LIMIT 5 } ?s ?q ?r }"
+        self.assertEqual(_ensure_limit(query, 10), f"{query}\nLIMIT 10")
+
+    def test_prefixed_name_is_not_limit(self):
+        query = "PREFIX ex: <http://example.org/>\nSELECT ?s WHERE { ?s ex:limit ?o }"
+        self.assertEqual(_ensure_limit(query, 10), f"{query}\nLIMIT 10")
+
+    def test_non_select_queries_are_unchanged(self):
+        for query in (
+            "ASK { ?s ?p ?o }",
+            "CONSTRUCT { ?s ?p ?o } WHERE { { SELECT * WHERE { ?s ?p ?o } } }",
+            "DESCRIBE <http://example.org/a>",
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(_ensure_limit(query, 10), query)
+
+
+if __name__ == "__main__":
+    unittest.main()